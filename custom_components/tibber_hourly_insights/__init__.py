@@ -1,23 +1,27 @@
 """The Tibber Hourly Insights integration."""
 from __future__ import annotations
 
+from datetime import datetime
 import logging
-from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform, EVENT_HOMEASSISTANT_STARTED
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, Platform
 from homeassistant.core import Event, HomeAssistant
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.start import async_at_started
 
-from .const import CONF_API_TOKEN, DOMAIN, ENTRY_DATA_COORDINATOR, TIBBER_PRICE_ENTITY
+from .const import CONF_API_TOKEN, DOMAIN, TIBBER_PRICE_ENTITY
 from .coordinator import TibberDataUpdateCoordinator
-from .tibber_api import TibberApiClient, TibberApiError
+from .tibber_api import TibberApiClient, TibberApiError, token_unique_id
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+# Tibber price states that should never trigger a refresh
+_INVALID_STATES = frozenset({STATE_UNAVAILABLE, STATE_UNKNOWN})
+
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Tibber Hourly Insights integration from YAML configuration."""
@@ -27,13 +31,18 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Tibber Hourly Insights from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-
     _LOGGER.debug("Setting up Tibber Hourly Insights integration")
 
     # Get API token from config entry
     api_token = entry.data[CONF_API_TOKEN]
 
+    # Entries created before the duplicate-token check have no unique_id;
+    # backfill it unless another entry already uses the same token
+    if entry.unique_id is None:
+        unique_id = token_unique_id(api_token)
+        if hass.config_entries.async_entry_for_domain_unique_id(DOMAIN, unique_id) is None:
+            hass.config_entries.async_update_entry(entry, unique_id=unique_id)
+
     # Create API client
     client = TibberApiClient(api_token, hass)
 
@@ -48,7 +57,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         raise ConfigEntryNotReady(f"Failed to connect to Tibber API: {err}") from err
 
     # Set up state change listener for official Tibber price entity
-    async def _setup_price_listener(event=None):
+    async def _setup_price_listener(_hass: HomeAssistant) -> None:
         """Set up listener for Tibber price changes."""
         try:
             _LOGGER.debug("Setting up Tibber price change listener")
@@ -64,32 +73,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 return
 
             # Track the last hour we updated to prevent duplicate refreshes
-            last_updated_hour = {"value": None}
+            last_hour_key: tuple[int, int, int, int] | None = None
+            request_refresh = coordinator.async_request_refresh
 
             async def _handle_tibber_price_change(event: Event) -> None:
                 """Handle state changes from official Tibber price sensor."""
-                new_state = event.data.get("new_state")
+                nonlocal last_hour_key
+
+                new_state = event.data["new_state"]
 
                 # Skip if state is unavailable or None
-                if new_state is None or new_state.state in ("unavailable", "unknown"):
-                    _LOGGER.debug("Skipping refresh: Tibber price state is %s",
-                                 new_state.state if new_state else "None")
+                if new_state is None or new_state.state in _INVALID_STATES:
                     return
 
                 # Get current hour to debounce updates
-                from datetime import datetime
-                current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+                now = datetime.now()
+                hour_key = (now.year, now.month, now.day, now.hour)
 
                 # Only refresh if we haven't updated this hour yet
-                if last_updated_hour["value"] == current_hour:
-                    _LOGGER.debug("Skipping refresh: Already updated for hour %s", current_hour)
+                if last_hour_key == hour_key:
+                    if _LOGGER.isEnabledFor(logging.DEBUG):
+                        _LOGGER.debug("Skipping refresh: Already updated for hour %02d:00", now.hour)
                     return
 
-                _LOGGER.info("Tibber price changed, refreshing insights (hour: %s)", current_hour)
-                last_updated_hour["value"] = current_hour
+                last_hour_key = hour_key
+                _LOGGER.info(
+                    "Tibber price changed, refreshing insights (hour: %s)",
+                    now.strftime("%Y-%m-%d %H:00"),
+                )
 
-                # Trigger coordinator refresh
-                await coordinator.async_request_refresh()
+                # Debounced by coordinator's 5s cooldown — safe to call per event
+                await request_refresh()
 
             # Register state change listener
             unsub = async_track_state_change_event(
@@ -102,18 +116,19 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 TIBBER_PRICE_ENTITY
             )
         except Exception as ex:
-            _LOGGER.error("Failed to set up price listener: %s", ex, exc_info=True)
+            # Only pay for traceback formatting when debugging
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.exception("Failed to set up price listener: %s", ex)
+            else:
+                _LOGGER.error(
+                    "Failed to set up price listener: %s: %s", type(ex).__name__, ex
+                )
 
-    # Set up listener when HA is running
-    if hass.is_running:
-        await _setup_price_listener()
-    else:
-        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _setup_price_listener)
+    # Set up listener once HA has started (immediately if already running)
+    entry.async_on_unload(async_at_started(hass, _setup_price_listener))
 
     # Store coordinator
-    hass.data[DOMAIN][entry.entry_id] = {
-        ENTRY_DATA_COORDINATOR: coordinator,
-    }
+    entry.runtime_data = coordinator
 
     # Forward setup to platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
@@ -134,18 +149,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     _LOGGER.debug("Unloading Tibber Hourly Insights integration")
 
-    # Unload platforms
+    # Unload platforms (Home Assistant drops entry.runtime_data on unload)
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
-    # Remove entry data
-    if unload_ok and DOMAIN in hass.data:
-        hass.data[DOMAIN].pop(entry.entry_id, None)
-
     _LOGGER.info("Tibber Hourly Insights integration unloaded successfully")
     return unload_ok
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    await hass.config_entries.async_reload(entry.entry_id)
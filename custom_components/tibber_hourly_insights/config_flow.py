@@ -1,6 +1,7 @@
 """Config flow for Tibber Hourly Insights integration."""
 from __future__ import annotations
 
+from functools import lru_cache
 import logging
 from typing import Any
 
@@ -56,7 +57,7 @@ from .const import (
     DEFAULT_WEIGHT_TIBBER,
     DOMAIN,
 )
-from .tibber_api import TibberApiClient
+from .tibber_api import TibberApiClient, token_unique_id
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -64,6 +65,187 @@ DATA_SCHEMA = vol.Schema({
     vol.Required(CONF_API_TOKEN): str,
 })
 
+_BOX = selector.NumberSelectorMode.BOX
+_SLIDER = selector.NumberSelectorMode.SLIDER
+_NumberSelector = selector.NumberSelector
+_NumberCfg = selector.NumberSelectorConfig
+_BooleanSelector = selector.BooleanSelector
+
+_WEIGHT_SELECTOR = _NumberSelector(
+    _NumberCfg(
+        min=0.0,
+        max=1.0,
+        step=0.1,
+        mode=_SLIDER,
+    )
+)
+_HOUR_SELECTOR = _NumberSelector(
+    _NumberCfg(
+        min=0,
+        max=23,
+        step=1,
+        mode=_BOX,
+    )
+)
+_GRID_FEE_SELECTOR = _NumberSelector(
+    _NumberCfg(
+        min=0.0,
+        max=2.0,
+        step=0.001,
+        mode=_BOX,
+        unit_of_measurement="NOK/kWh",
+    )
+)
+
+# Options flow selectors never change shape, so build them once at import
+_SELECTORS: dict[str, selector.Selector] = {
+    CONF_WEIGHT_TIBBER: _WEIGHT_SELECTOR,
+    CONF_WEIGHT_48H: _WEIGHT_SELECTOR,
+    CONF_WEIGHT_30D: _WEIGHT_SELECTOR,
+    CONF_VERY_CHEAP_PCT: _NumberSelector(
+        _NumberCfg(
+            min=-100.0,
+            max=0.0,
+            step=5.0,
+            mode=_BOX,
+        )
+    ),
+    CONF_CHEAP_PCT: _NumberSelector(
+        _NumberCfg(
+            min=-100.0,
+            max=0.0,
+            step=5.0,
+            mode=_BOX,
+            unit_of_measurement="%",
+        )
+    ),
+    CONF_NORMAL_PCT: _NumberSelector(
+        _NumberCfg(
+            min=-50.0,
+            max=50.0,
+            step=5.0,
+            mode=_BOX,
+            unit_of_measurement="%",
+        )
+    ),
+    CONF_EXPENSIVE_PCT: _NumberSelector(
+        _NumberCfg(
+            min=0.0,
+            max=100.0,
+            step=5.0,
+            mode=_BOX,
+            unit_of_measurement="%",
+        )
+    ),
+    CONF_VERY_EXPENSIVE_PCT: _NumberSelector(
+        _NumberCfg(
+            min=0.0,
+            max=100.0,
+            step=5.0,
+            mode=_BOX,
+            unit_of_measurement="%",
+        )
+    ),
+    CONF_ENABLE_30D_BASELINE: _BooleanSelector(),
+    CONF_ENABLE_TIBBER_FALLBACK: _BooleanSelector(),
+    CONF_FALLBACK_MIN_SAMPLES: _NumberSelector(
+        _NumberCfg(
+            min=1,
+            max=30,
+            step=1,
+            mode=_BOX,
+        )
+    ),
+    CONF_FALLBACK_MAX_FETCH_HOURS: _NumberSelector(
+        _NumberCfg(
+            min=24,
+            max=1000,
+            step=24,
+            mode=_BOX,
+        )
+    ),
+    CONF_ENABLE_GRID_FEE: _BooleanSelector(),
+    CONF_GRID_FEE_DAY: _GRID_FEE_SELECTOR,
+    CONF_GRID_FEE_NIGHT: _GRID_FEE_SELECTOR,
+    CONF_DAY_START_HOUR: _HOUR_SELECTOR,
+    CONF_DAY_END_HOUR: _HOUR_SELECTOR,
+    CONF_ENABLE_SUBSIDY: _BooleanSelector(),
+    CONF_SUBSIDY_THRESHOLD: _NumberSelector(
+        _NumberCfg(
+            min=0.0,
+            max=5.0,
+            # HA validation rejects overly small steps; 0.001 keeps options flow valid
+            step=0.001,
+            mode=_BOX,
+            unit_of_measurement="NOK/kWh",
+        )
+    ),
+    CONF_SUBSIDY_PERCENTAGE: _NumberSelector(
+        _NumberCfg(
+            min=0.0,
+            max=100.0,
+            step=1.0,
+            mode=_BOX,
+            unit_of_measurement="%",
+        )
+    ),
+}
+
+# Options in the order they are shown, with their defaults
+_OPTION_DEFS: list[tuple[str, Any]] = [
+    (CONF_WEIGHT_TIBBER, DEFAULT_WEIGHT_TIBBER),
+    (CONF_WEIGHT_48H, DEFAULT_WEIGHT_48H),
+    (CONF_WEIGHT_30D, DEFAULT_WEIGHT_30D),
+    (CONF_VERY_CHEAP_PCT, DEFAULT_VERY_CHEAP_PCT),
+    (CONF_CHEAP_PCT, DEFAULT_CHEAP_PCT),
+    (CONF_NORMAL_PCT, DEFAULT_NORMAL_PCT),
+    (CONF_EXPENSIVE_PCT, DEFAULT_EXPENSIVE_PCT),
+    (CONF_VERY_EXPENSIVE_PCT, DEFAULT_VERY_EXPENSIVE_PCT),
+    (CONF_ENABLE_30D_BASELINE, DEFAULT_ENABLE_30D_BASELINE),
+    (CONF_ENABLE_TIBBER_FALLBACK, DEFAULT_ENABLE_TIBBER_FALLBACK),
+    (CONF_FALLBACK_MIN_SAMPLES, DEFAULT_FALLBACK_MIN_SAMPLES),
+    (CONF_FALLBACK_MAX_FETCH_HOURS, DEFAULT_FALLBACK_MAX_FETCH_HOURS),
+    (CONF_ENABLE_GRID_FEE, DEFAULT_ENABLE_GRID_FEE),
+    (CONF_GRID_FEE_DAY, DEFAULT_GRID_FEE_DAY),
+    (CONF_GRID_FEE_NIGHT, DEFAULT_GRID_FEE_NIGHT),
+    (CONF_DAY_START_HOUR, DEFAULT_DAY_START_HOUR),
+    (CONF_DAY_END_HOUR, DEFAULT_DAY_END_HOUR),
+    (CONF_ENABLE_SUBSIDY, DEFAULT_ENABLE_SUBSIDY),
+    (CONF_SUBSIDY_THRESHOLD, DEFAULT_SUBSIDY_THRESHOLD),
+    (CONF_SUBSIDY_PERCENTAGE, DEFAULT_SUBSIDY_PERCENTAGE),
+]
+
+# Number selectors submit floats; coerce whole-number options back to int
+_INT_OPTIONS = frozenset({
+    CONF_FALLBACK_MIN_SAMPLES,
+    CONF_FALLBACK_MAX_FETCH_HOURS,
+    CONF_DAY_START_HOUR,
+    CONF_DAY_END_HOUR,
+})
+
+# Type validator for submitted options, separate from the UI schema
+_OPTIONS_TYPE_SCHEMA = vol.Schema({
+    vol.Optional(key): (
+        vol.Boolean() if isinstance(default, bool)
+        else vol.Coerce(int) if key in _INT_OPTIONS
+        else vol.Coerce(float)
+    )
+    for key, default in _OPTION_DEFS
+})
+
+
+@lru_cache(maxsize=8)
+def _build_options_schema(defaults: tuple[Any, ...]) -> vol.Schema:
+    """Build the options form schema for the given current values.
+
+    Args:
+        defaults: Current value of each option, in _OPTION_DEFS order
+    """
+    return vol.Schema({
+        vol.Optional(key, default=default): _SELECTORS[key]
+        for (key, _), default in zip(_OPTION_DEFS, defaults)
+    })
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
@@ -76,8 +258,7 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     client = TibberApiClient(api_token, hass)
 
     try:
-        # Validate token by fetching current price
-        await client.get_current_price()
+        await client.validate_token()
     except Exception as err:
         _LOGGER.error("Failed to validate Tibber API token: %s", err)
         raise InvalidAuth from err
@@ -98,6 +279,12 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
 
         if user_input is not None:
+            # Cheap duplicate check before hitting the Tibber API
+            await self.async_set_unique_id(
+                token_unique_id(user_input[CONF_API_TOKEN])
+            )
+            self._abort_if_unique_id_configured()
+
             try:
                 info = await validate_input(self.hass, user_input)
             except CannotConnect:
@@ -121,267 +308,38 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     @callback
     def async_get_options_flow(config_entry):
         """Get the options flow for this handler."""
-        _LOGGER.warning("🔵 async_get_options_flow called with config_entry: %s", config_entry.entry_id if config_entry else "None")
-        handler = OptionsFlowHandler()
-        _LOGGER.warning("🔵 OptionsFlowHandler instantiated: %s", handler)
-        return handler
+        _LOGGER.debug("Opening options flow for %s", config_entry.entry_id)
+        return OptionsFlowHandler()
 
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     """Handle options flow for Tibber Hourly Insights."""
 
-    def __init__(self) -> None:
-        """Initialize options flow."""
-        super().__init__()
-        _LOGGER.warning("🟢 OptionsFlowHandler.__init__ called")
-
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
-        _LOGGER.warning("🟡 async_step_init called with user_input: %s", "provided" if user_input else "None")
-
-        # Check what attributes are available
-        _LOGGER.warning("🟡 Has config_entry: %s", hasattr(self, 'config_entry'))
-        _LOGGER.warning("🟡 Has handler: %s", hasattr(self, 'handler'))
-        _LOGGER.warning("🟡 Has _handler: %s", hasattr(self, '_handler'))
-
         if user_input is not None:
-            _LOGGER.warning("🟡 Saving user input")
-            return self.async_create_entry(title="", data=user_input)
+            return self.async_create_entry(
+                title="", data=_OPTIONS_TYPE_SCHEMA(user_input)
+            )
 
-        # Try to get config_entry
-        try:
-            _LOGGER.warning("🟡 Attempting to access self.config_entry")
-            config_entry = self.config_entry
-            _LOGGER.warning("🟢 config_entry accessed successfully: %s", config_entry.entry_id)
-            options = config_entry.options
-            _LOGGER.warning("🟢 options retrieved: %s keys", len(options))
-        except AttributeError as e:
-            _LOGGER.error("🔴 AttributeError accessing config_entry: %s", e)
-            _LOGGER.error("🔴 Available attributes: %s", [a for a in dir(self) if not a.startswith('_')])
-            raise
-        except Exception as e:
-            _LOGGER.error("🔴 Unexpected error: %s", e, exc_info=True)
-            raise
-
-        _LOGGER.warning("🟡 Building options schema")
+        get = self.config_entry.options.get
 
         try:
-            options_schema = vol.Schema({
-                vol.Optional(
-                    CONF_WEIGHT_TIBBER,
-                    default=options.get(CONF_WEIGHT_TIBBER, DEFAULT_WEIGHT_TIBBER)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=1.0,
-                        step=0.1,
-                        mode=selector.NumberSelectorMode.SLIDER,
-                    )
-                ),
-                vol.Optional(
-                    CONF_WEIGHT_48H,
-                    default=options.get(CONF_WEIGHT_48H, DEFAULT_WEIGHT_48H)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=1.0,
-                        step=0.1,
-                        mode=selector.NumberSelectorMode.SLIDER,
-                    )
-                ),
-                vol.Optional(
-                    CONF_WEIGHT_30D,
-                    default=options.get(CONF_WEIGHT_30D, DEFAULT_WEIGHT_30D)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=1.0,
-                        step=0.1,
-                        mode=selector.NumberSelectorMode.SLIDER,
-                    )
-                ),
-                vol.Optional(
-                    CONF_VERY_CHEAP_PCT,
-                    default=options.get(CONF_VERY_CHEAP_PCT, DEFAULT_VERY_CHEAP_PCT)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=-100.0,
-                        max=0.0,
-                        step=5.0,
-                        mode=selector.NumberSelectorMode.BOX,
-                    )
-                ),
-                vol.Optional(
-                    CONF_CHEAP_PCT,
-                    default=options.get(CONF_CHEAP_PCT, DEFAULT_CHEAP_PCT)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=-100.0,
-                        max=0.0,
-                        step=5.0,
-                        mode=selector.NumberSelectorMode.BOX,
-                        unit_of_measurement="%",
-                    )
-                ),
-                vol.Optional(
-                    CONF_NORMAL_PCT,
-                    default=options.get(CONF_NORMAL_PCT, DEFAULT_NORMAL_PCT)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=-50.0,
-                        max=50.0,
-                        step=5.0,
-                        mode=selector.NumberSelectorMode.BOX,
-                        unit_of_measurement="%",
-                    )
-                ),
-                vol.Optional(
-                    CONF_EXPENSIVE_PCT,
-                    default=options.get(CONF_EXPENSIVE_PCT, DEFAULT_EXPENSIVE_PCT)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=100.0,
-                        step=5.0,
-                        mode=selector.NumberSelectorMode.BOX,
-                        unit_of_measurement="%",
-                    )
-                ),
-                vol.Optional(
-                    CONF_VERY_EXPENSIVE_PCT,
-                    default=options.get(CONF_VERY_EXPENSIVE_PCT, DEFAULT_VERY_EXPENSIVE_PCT)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=100.0,
-                        step=5.0,
-                        mode=selector.NumberSelectorMode.BOX,
-                        unit_of_measurement="%",
-                    )
-                ),
-                vol.Optional(
-                    CONF_ENABLE_30D_BASELINE,
-                    default=options.get(CONF_ENABLE_30D_BASELINE, DEFAULT_ENABLE_30D_BASELINE)
-                ): selector.BooleanSelector(),
-                vol.Optional(
-                    CONF_ENABLE_TIBBER_FALLBACK,
-                    default=options.get(CONF_ENABLE_TIBBER_FALLBACK, DEFAULT_ENABLE_TIBBER_FALLBACK)
-                ): selector.BooleanSelector(),
-                vol.Optional(
-                    CONF_FALLBACK_MIN_SAMPLES,
-                    default=options.get(CONF_FALLBACK_MIN_SAMPLES, DEFAULT_FALLBACK_MIN_SAMPLES)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=1,
-                        max=30,
-                        step=1,
-                        mode=selector.NumberSelectorMode.BOX,
-                    )
-                ),
-                vol.Optional(
-                    CONF_FALLBACK_MAX_FETCH_HOURS,
-                    default=options.get(CONF_FALLBACK_MAX_FETCH_HOURS, DEFAULT_FALLBACK_MAX_FETCH_HOURS)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=24,
-                        max=1000,
-                        step=24,
-                        mode=selector.NumberSelectorMode.BOX,
-                    )
-                ),
-                vol.Optional(
-                    CONF_ENABLE_GRID_FEE,
-                    default=options.get(CONF_ENABLE_GRID_FEE, DEFAULT_ENABLE_GRID_FEE)
-                ): selector.BooleanSelector(),
-                vol.Optional(
-                    CONF_GRID_FEE_DAY,
-                    default=options.get(CONF_GRID_FEE_DAY, DEFAULT_GRID_FEE_DAY)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=2.0,
-                        step=0.001,
-                        mode=selector.NumberSelectorMode.BOX,
-                        unit_of_measurement="NOK/kWh",
-                    )
-                ),
-                vol.Optional(
-                    CONF_GRID_FEE_NIGHT,
-                    default=options.get(CONF_GRID_FEE_NIGHT, DEFAULT_GRID_FEE_NIGHT)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=2.0,
-                        step=0.001,
-                        mode=selector.NumberSelectorMode.BOX,
-                        unit_of_measurement="NOK/kWh",
-                    )
-                ),
-                vol.Optional(
-                    CONF_DAY_START_HOUR,
-                    default=options.get(CONF_DAY_START_HOUR, DEFAULT_DAY_START_HOUR)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0,
-                        max=23,
-                        step=1,
-                        mode=selector.NumberSelectorMode.BOX,
-                    )
-                ),
-                vol.Optional(
-                    CONF_DAY_END_HOUR,
-                    default=options.get(CONF_DAY_END_HOUR, DEFAULT_DAY_END_HOUR)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0,
-                        max=23,
-                        step=1,
-                        mode=selector.NumberSelectorMode.BOX,
-                    )
-                ),
-                vol.Optional(
-                    CONF_ENABLE_SUBSIDY,
-                    default=options.get(CONF_ENABLE_SUBSIDY, DEFAULT_ENABLE_SUBSIDY)
-                ): selector.BooleanSelector(),
-            vol.Optional(
-                CONF_SUBSIDY_THRESHOLD,
-                default=options.get(CONF_SUBSIDY_THRESHOLD, DEFAULT_SUBSIDY_THRESHOLD)
-            ): selector.NumberSelector(
-                selector.NumberSelectorConfig(
-                    min=0.0,
-                    max=5.0,
-                    # HA validation rejects overly small steps; 0.001 keeps options flow valid
-                    step=0.001,
-                    mode=selector.NumberSelectorMode.BOX,
-                    unit_of_measurement="NOK/kWh",
+            options_schema = _build_options_schema(
+                tuple(get(key, default) for key, default in _OPTION_DEFS)
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            # Only pay for traceback formatting when debugging
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                _LOGGER.exception("Failed to build options schema: %s", err)
+            else:
+                _LOGGER.error(
+                    "Failed to build options schema: %s: %s", type(err).__name__, err
                 )
-            ),
-                vol.Optional(
-                    CONF_SUBSIDY_PERCENTAGE,
-                    default=options.get(CONF_SUBSIDY_PERCENTAGE, DEFAULT_SUBSIDY_PERCENTAGE)
-                ): selector.NumberSelector(
-                    selector.NumberSelectorConfig(
-                        min=0.0,
-                        max=100.0,
-                        step=1.0,
-                        mode=selector.NumberSelectorMode.BOX,
-                        unit_of_measurement="%",
-                    )
-                ),
-            })
-
-            _LOGGER.warning("🟢 Schema built successfully, returning form")
-
-        except Exception as e:
-            _LOGGER.error("🔴 CRITICAL: Schema building failed!")
-            _LOGGER.error("🔴 Error type: %s", type(e).__name__)
-            _LOGGER.error("🔴 Error message: %s", str(e))
-            _LOGGER.error("🔴 Full traceback:", exc_info=True)
 
             # Return a minimal fallback schema to prevent complete failure
-            _LOGGER.warning("🟡 Returning minimal fallback schema")
             return self.async_show_form(
                 step_id="init",
                 data_schema=vol.Schema({}),
@@ -69,9 +69,7 @@ DEFAULT_SUBSIDY_PERCENTAGE = 90.0  # Government covers 90% above threshold
 
 # Update interval
 UPDATE_INTERVAL = timedelta(hours=1)
-
-# Entry data keys
-ENTRY_DATA_COORDINATOR = "coordinator"
+REQUEST_REFRESH_COOLDOWN = 5.0  # Seconds to batch refresh requests
 
 # Sensor constants
 ATTR_CURRENCY = "currency"
@@ -89,6 +87,7 @@ ATTR_DATA_SOURCE = "data_source"
 # 30-day baseline attributes
 ATTR_BASELINE_PRICE = "baseline_price"
 ATTR_COMPARISON = "comparison"
+ATTR_COMPARISON_DISPLAY = "comparison_display"
 ATTR_DIFFERENCE_PERCENT = "difference_percent"
 ATTR_SAMPLE_COUNT = "sample_count"
 
@@ -116,3 +115,6 @@ TIBBER_USER_AGENT = "Tibber-Hourly-Insights/0.2.0"
 
 # Official Tibber integration entity
 TIBBER_PRICE_ENTITY = "sensor.home_electricity_price"
+
+# Own current price entity whose recorder history forms the 30-day baseline
+BASELINE_SOURCE_ENTITY = "sensor.tibber_current_price"
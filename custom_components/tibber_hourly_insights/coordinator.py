@@ -1,33 +1,37 @@
 """Data update coordinator for Tibber Hourly Insights."""
 from __future__ import annotations
 
+from datetime import date
+from itertools import chain
 import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
-    CONF_DAY_END_HOUR,
-    CONF_DAY_START_HOUR,
-    CONF_ENABLE_GRID_FEE,
-    CONF_ENABLE_SUBSIDY,
-    CONF_GRID_FEE_DAY,
-    CONF_GRID_FEE_NIGHT,
-    CONF_SUBSIDY_PERCENTAGE,
-    CONF_SUBSIDY_THRESHOLD,
-    DEFAULT_DAY_END_HOUR,
-    DEFAULT_DAY_START_HOUR,
-    DEFAULT_ENABLE_GRID_FEE,
-    DEFAULT_ENABLE_SUBSIDY,
-    DEFAULT_GRID_FEE_DAY,
-    DEFAULT_GRID_FEE_NIGHT,
-    DEFAULT_SUBSIDY_PERCENTAGE,
-    DEFAULT_SUBSIDY_THRESHOLD,
+    BASELINE_SOURCE_ENTITY,
+    CONF_ENABLE_30D_BASELINE,
+    CONF_ENABLE_TIBBER_FALLBACK,
+    CONF_FALLBACK_MAX_FETCH_HOURS,
+    CONF_FALLBACK_MIN_SAMPLES,
+    DEFAULT_ENABLE_30D_BASELINE,
+    DEFAULT_ENABLE_TIBBER_FALLBACK,
+    DEFAULT_FALLBACK_MAX_FETCH_HOURS,
+    DEFAULT_FALLBACK_MIN_SAMPLES,
     DOMAIN,
+    REQUEST_REFRESH_COOLDOWN,
+)
+from .history import TibberHistoryHelper
+from .price_adjustments import (
+    PriceAdjustmentConfig,
+    adjust_price_list,
+    calculate_adjusted_price,
+    calculate_adjusted_price_fast,
+    starts_at_hour,
 )
-from .price_adjustments import adjust_price_list, calculate_adjusted_price
 from .tibber_api import TibberApiClient, TibberApiError
 
 _LOGGER = logging.getLogger(__name__)
@@ -43,12 +47,44 @@ class TibberDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         self.client = client
         self.entry = entry
         self.yesterday_prices: list[dict[str, Any]] = []
+        self._yesterday_date: date | None = None
+        # Options changes reload the entry, so these are resolved once per setup
+        options = entry.options
+        self._adjustment_cfg = PriceAdjustmentConfig.from_options(options)
+        self._adjusted_cache: dict[tuple[str | None, int], list[dict[str, Any]]] = {}
+
+        # Same-hour 30-day baseline, only when the baseline sensor is enabled
+        self._history_helper: TibberHistoryHelper | None = None
+        if options.get(CONF_ENABLE_30D_BASELINE, DEFAULT_ENABLE_30D_BASELINE):
+            self._history_helper = TibberHistoryHelper(hass, BASELINE_SOURCE_ENTITY)
+        enable_fallback = options.get(
+            CONF_ENABLE_TIBBER_FALLBACK, DEFAULT_ENABLE_TIBBER_FALLBACK
+        )
+        self._baseline_options: dict[str, Any] = {
+            "tibber_client": client if enable_fallback else None,
+            "enable_fallback": enable_fallback,
+            "min_samples": options.get(
+                CONF_FALLBACK_MIN_SAMPLES, DEFAULT_FALLBACK_MIN_SAMPLES
+            ),
+            "max_fetch_hours": options.get(
+                CONF_FALLBACK_MAX_FETCH_HOURS, DEFAULT_FALLBACK_MAX_FETCH_HOURS
+            ),
+        }
 
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
             # No update_interval - updates triggered by Tibber price state changes
+            # Collapse bursts of refresh requests (e.g. state restores at startup)
+            request_refresh_debouncer=Debouncer(
+                hass,
+                _LOGGER,
+                cooldown=REQUEST_REFRESH_COOLDOWN,
+                immediate=False,
+            ),
+            # Skip listener callbacks when a refresh returns identical data
+            always_update=False,
         )
 
     async def _async_update_data(self) -> dict[str, Any]:
@@ -60,27 +96,31 @@ class TibberDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
                 - today: List of today's hourly prices (with adjustments applied)
                 - tomorrow: List of tomorrow's hourly prices (with adjustments applied)
                 - yesterday: List of yesterday's hourly prices (with adjustments applied)
+                - has_current_price: Whether the current price is known
+                - has_level: Whether Tibber's current price level is known
+                - stats_48h: Statistics of the 48h comparison window (None if empty)
+                - baseline_30d: Same-hour 30-day baseline (None if disabled or failed)
         """
         try:
             data = await self.client.get_price_data()
             _LOGGER.debug("Successfully fetched Tibber price data")
 
+            today = data.get("today") or []
+            tomorrow = data.get("tomorrow") or []
+
             # Store yesterday's prices when tomorrow becomes available
             # Tomorrow typically arrives around 13:00
-            if data.get("tomorrow") and not self.yesterday_prices:
-                # If we have tomorrow but no yesterday stored, store current today as yesterday
-                self.yesterday_prices = data.get("today", [])
-                _LOGGER.info("Stored today's prices as yesterday for future comparison")
-            elif data.get("tomorrow") and self.yesterday_prices:
-                # If tomorrow exists and we already have yesterday, update yesterday to previous today
-                # This happens during the daily transition
-                current_today_first = data.get("today", [{}])[0].get("startsAt", "")
-                yesterday_first = self.yesterday_prices[0].get("startsAt", "") if self.yesterday_prices else ""
-
-                # Check if today has changed (new day)
-                if current_today_first and yesterday_first and current_today_first > yesterday_first:
-                    self.yesterday_prices = data.get("today", [])
-                    _LOGGER.info("Updated yesterday prices to previous today")
+            if tomorrow and today and (starts_at := today[0].get("startsAt")):
+                current_today_date = date.fromisoformat(starts_at[:10])
+
+                # Store today as yesterday on first sight, then on each new day
+                if self._yesterday_date is None or current_today_date > self._yesterday_date:
+                    if self._yesterday_date is None:
+                        _LOGGER.info("Stored today's prices as yesterday for future comparison")
+                    else:
+                        _LOGGER.info("Updated yesterday prices to previous today")
+                    self.yesterday_prices = today
+                    self._yesterday_date = current_today_date
 
             # Add yesterday to the response
             data["yesterday"] = self.yesterday_prices
@@ -88,11 +128,34 @@ class TibberDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
             # Apply price adjustments to all price data
             data = self._apply_price_adjustments(data)
 
+            # Availability flags shared by all sensors
+            current = data.get("current") or {}
+            data["has_current_price"] = current.get("total") is not None
+            data["has_level"] = current.get("level") is not None
+
+            # 48h window statistics shared by all sensors
+            data["stats_48h"] = _window_stats(data)
+
+            data["baseline_30d"] = await self._async_get_baseline()
+
             return data
         except TibberApiError as err:
             _LOGGER.error("Error fetching Tibber data: %s", err)
             raise UpdateFailed(f"Error communicating with Tibber API: {err}") from err
 
+    async def _async_get_baseline(self) -> dict[str, Any] | None:
+        """Return the 30-day same-hour baseline, or None if unavailable."""
+        if self._history_helper is None:
+            return None
+
+        try:
+            return await self._history_helper.get_same_hour_average(
+                days=30, **self._baseline_options
+            )
+        except Exception as err:
+            _LOGGER.error("Error updating 30-day baseline: %s", err)
+            return None
+
     def _apply_price_adjustments(self, data: dict[str, Any]) -> dict[str, Any]:
         """Apply price adjustments (subsidy and grid fees) to all price data.
 
@@ -102,62 +165,113 @@ class TibberDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         Returns:
             Price data with adjustments applied
         """
-        # Get adjustment settings from config entry options
-        options = self.entry.options
-        enable_subsidy = options.get(CONF_ENABLE_SUBSIDY, DEFAULT_ENABLE_SUBSIDY)
-        subsidy_threshold = options.get(CONF_SUBSIDY_THRESHOLD, DEFAULT_SUBSIDY_THRESHOLD)
-        subsidy_percentage = options.get(CONF_SUBSIDY_PERCENTAGE, DEFAULT_SUBSIDY_PERCENTAGE)
-        enable_grid_fee = options.get(CONF_ENABLE_GRID_FEE, DEFAULT_ENABLE_GRID_FEE)
-        grid_fee_day = options.get(CONF_GRID_FEE_DAY, DEFAULT_GRID_FEE_DAY)
-        grid_fee_night = options.get(CONF_GRID_FEE_NIGHT, DEFAULT_GRID_FEE_NIGHT)
-        day_start_hour = options.get(CONF_DAY_START_HOUR, DEFAULT_DAY_START_HOUR)
-        day_end_hour = options.get(CONF_DAY_END_HOUR, DEFAULT_DAY_END_HOUR)
+        cfg = self._adjustment_cfg
 
         # Skip adjustments if both are disabled
-        if not enable_subsidy and not enable_grid_fee:
+        if not cfg.any_enabled:
             _LOGGER.debug("Price adjustments disabled, returning raw prices")
             return data
 
         _LOGGER.debug(
             "Applying price adjustments: subsidy=%s, grid_fee=%s",
-            enable_subsidy,
-            enable_grid_fee,
+            cfg.enable_subsidy,
+            cfg.enable_grid_fee,
         )
 
         # Apply adjustments to current price
         if data.get("current"):
             current = data["current"]
-            adjustment = calculate_adjusted_price(
-                spot_price=current.get("total", 0.0),
-                timestamp=current.get("startsAt", ""),
-                enable_subsidy=enable_subsidy,
-                subsidy_threshold=subsidy_threshold,
-                subsidy_percentage=subsidy_percentage,
-                enable_grid_fee=enable_grid_fee,
-                grid_fee_day=grid_fee_day,
-                grid_fee_night=grid_fee_night,
-                day_start_hour=day_start_hour,
-                day_end_hour=day_end_hour,
-            )
+            spot_price = current.get("total", 0.0)
+            starts_at = current.get("startsAt", "")
+            try:
+                adjustment = calculate_adjusted_price_fast(
+                    spot_price, starts_at_hour(starts_at), cfg
+                )
+            except ValueError:
+                # Not in Tibber's fixed format, fall back to full parsing
+                adjustment = calculate_adjusted_price(spot_price, starts_at, cfg)
             # Store raw price and update with adjusted price
             current["raw_spot_price"] = adjustment["raw_spot_price"]
             current["subsidy_amount"] = adjustment["subsidy_amount"]
             current["grid_fee"] = adjustment["grid_fee"]
             current["total"] = adjustment["adjusted_price"]
 
-        # Apply adjustments to today, tomorrow, yesterday arrays
-        for key in ["today", "tomorrow", "yesterday"]:
-            if data.get(key):
-                data[key] = adjust_price_list(
-                    price_entries=data[key],
-                    enable_subsidy=enable_subsidy,
-                    subsidy_threshold=subsidy_threshold,
-                    subsidy_percentage=subsidy_percentage,
-                    enable_grid_fee=enable_grid_fee,
-                    grid_fee_day=grid_fee_day,
-                    grid_fee_night=grid_fee_night,
-                    day_start_hour=day_start_hour,
-                    day_end_hour=day_end_hour,
-                )
+        # Day-ahead prices never change once published, so adjusted lists are
+        # reused across updates keyed by (first startsAt, length)
+        cache = self._adjusted_cache
+        keys: dict[str, tuple[str | None, int]] = {}
+        pending: dict[tuple[str | None, int], list[dict[str, Any]]] = {}
+        for name in ("today", "tomorrow", "yesterday"):
+            if entries := data.get(name):
+                key = (entries[0].get("startsAt"), len(entries))
+                keys[name] = key
+                if key not in cache:
+                    pending[key] = entries
+
+        # Adjust all uncached lists in one pass
+        if pending:
+            all_entries = [entry for entries in pending.values() for entry in entries]
+            adjusted = adjust_price_list(all_entries, cfg)
+            if len(adjusted) == len(all_entries):
+                start = 0
+                for key, entries in pending.items():
+                    end = start + len(entries)
+                    cache[key] = adjusted[start:end]
+                    start = end
+            else:
+                # Invalid entries were dropped, so the slices would not line up
+                for key, entries in pending.items():
+                    cache[key] = adjust_price_list(entries, cfg)
+
+        for name, key in keys.items():
+            data[name] = cache[key]
+
+        # Forget days that are no longer part of the data
+        in_use = set(keys.values())
+        for key in [key for key in cache if key not in in_use]:
+            del cache[key]
 
         return data
+
+
+def _window_stats(data: dict[str, Any]) -> dict[str, Any] | None:
+    """Return statistics of the adjusted prices in the 48h comparison window.
+
+    Uses today + tomorrow once tomorrow is published (~13:00), otherwise
+    yesterday + today, falling back to today alone.
+
+    Returns:
+        dict with keys sorted_prices (ascending, for percentile lookups),
+        min, max, avg, pct_vs_avg (current price vs the window average, None
+        without a current price) and source, or None if the window has no
+        prices
+    """
+    today = data.get("today") or []
+    if tomorrow := data.get("tomorrow"):
+        entries = chain(today, tomorrow)
+        source = "today+tomorrow"
+    elif yesterday := data.get("yesterday"):
+        entries = chain(yesterday, today)
+        source = "yesterday+today"
+    else:
+        entries = today
+        source = "today"
+
+    prices = [total for entry in entries if (total := entry.get("total")) is not None]
+    if not prices:
+        return None
+
+    prices.sort()
+    avg = sum(prices) / len(prices)
+    pct_vs_avg = None
+    if (current_price := (data.get("current") or {}).get("total")) is not None:
+        pct_vs_avg = ((current_price - avg) / avg) * 100 if avg else 0.0
+
+    return {
+        "sorted_prices": prices,
+        "min": prices[0],
+        "max": prices[-1],
+        "avg": avg,
+        "pct_vs_avg": pct_vs_avg,
+        "source": source,
+    }
@@ -1,12 +1,18 @@
 """Historical data utilities for Tibber price analysis."""
 from __future__ import annotations
 
-from datetime import datetime, timedelta
+import asyncio
+from collections.abc import Iterable
+from datetime import date, datetime, timedelta
 import logging
 from typing import Any, TYPE_CHECKING
 
+from sqlalchemy import and_, or_, select
+
 from homeassistant.components import recorder
-from homeassistant.components.recorder import history
+from homeassistant.components.recorder.db_schema import States, StatesMeta
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
 from homeassistant.core import HomeAssistant
 import homeassistant.util.dt as dt_util
 
@@ -15,14 +21,93 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
+# Same-hour averages kept per helper (one per lookback window in practice)
+_AVERAGE_CACHE_SIZE = 4
+
+# Recorder states that never carry a usable price
+_INVALID_STATES = frozenset({STATE_UNAVAILABLE, STATE_UNKNOWN, None})
+
+
+def _same_hour_windows(now: datetime, days: int) -> list[tuple[float, float]]:
+    """Return one (start, end) UNIX window per day covering the current local hour.
+
+    The first window is today's; each following window is one day earlier.
+    """
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    windows = []
+    for day in range(days):
+        window_start = (hour_start - timedelta(days=day)).timestamp()
+        windows.append((window_start, window_start + 3600))
+    return windows
+
+
+def _may_be_local_hour(
+    timestamp: str, target_hour: int, local_offsets: frozenset[int]
+) -> bool:
+    """Cheaply check whether an ISO timestamp can fall in a local hour.
+
+    Reads the wall clock and UTC offset straight from the fixed-format string
+    (e.g. 2024-01-15T14:00:00.000+01:00) and tries every local UTC offset (in
+    minutes) in effect over the queried range. Accepts "Z", "+HH:MM" and
+    "+HHMM" suffixes. Only returns False when the timestamp definitely does
+    not match; any other string returns True so the caller falls back to a
+    full parse.
+    """
+    try:
+        minute_of_day = int(timestamp[11:13]) * 60 + int(timestamp[14:16])
+        if timestamp[-1] == "Z":
+            offset = 0
+        elif timestamp[-6:-5] in ("+", "-") and timestamp[-3] == ":":
+            sign = timestamp[-6]
+            offset = int(timestamp[-5:-3]) * 60 + int(timestamp[-2:])
+        elif timestamp[-5:-4] in ("+", "-") and timestamp[-3] != ":":
+            sign = timestamp[-5]
+            offset = int(timestamp[-4:-2]) * 60 + int(timestamp[-2:])
+        else:
+            return True
+    except (ValueError, IndexError):
+        return True
+    if offset and sign == "-":
+        offset = -offset
+    minute_of_day -= offset
+    return any(
+        (minute_of_day + offset) % 1440 // 60 == target_hour
+        for offset in local_offsets
+    )
+
+
+def _prices_by_date(rows: Iterable[tuple[str | None, float]]) -> dict[date, float]:
+    """Return the latest numeric price per local date.
+
+    Args:
+        rows: (raw state value, last_updated_ts) rows in timestamp order
+    """
+    as_local = dt_util.as_local
+    utc_from_timestamp = dt_util.utc_from_timestamp
+    prices: dict[date, float] = {}
+    for value, timestamp in rows:
+        if value in _INVALID_STATES:
+            continue
+        try:
+            price = float(value)
+        except (ValueError, TypeError):
+            continue
+        prices[as_local(utc_from_timestamp(timestamp)).date()] = price
+    return prices
+
 
 class TibberHistoryHelper:
     """Helper class for querying historical Tibber price data."""
 
+    __slots__ = ("hass", "entity_id", "_average_cache", "_fallback_expected")
+
     def __init__(self, hass: HomeAssistant, entity_id: str) -> None:
         """Initialize the history helper."""
         self.hass = hass
         self.entity_id = entity_id
+        self._average_cache: dict[tuple[str, str, int], dict[str, Any]] = {}
+        # Whether the last lookup had to fall back to the Tibber API
+        self._fallback_expected = False
 
     async def fetch_tibber_fallback(
         self,
@@ -30,17 +115,18 @@ class TibberHistoryHelper:
         target_hour: int,
         missing_days: int,
         max_hours: int = 720,
-    ) -> list[float]:
+    ) -> list[tuple[date, float]]:
         """Fetch historical prices from Tibber API for missing days.
 
         Args:
             tibber_client: Tibber API client instance
             target_hour: Hour of day to filter (0-23)
-            missing_days: Estimated days of missing data
+            missing_days: Days to look back to cover the missing data
             max_hours: Maximum hours to fetch from API (default 720 = 30 days)
 
         Returns:
-            List of prices for the target hour from Tibber consumption API
+            List of (local date, price) pairs for the target hour from the
+            Tibber consumption API
         """
         try:
             # Calculate hours to fetch, capped at max_hours
@@ -62,6 +148,14 @@ class TibberHistoryHelper:
                 return []
 
             # Filter nodes to target hour and extract prices
+            now = dt_util.now()
+            local_tz = now.tzinfo
+            # At most one DST change falls inside the fetched range
+            local_offsets = frozenset(
+                int(moment.utcoffset().total_seconds()) // 60
+                for moment in (now, now - timedelta(hours=hours_to_fetch))
+            )
+            fromisoformat = datetime.fromisoformat
             prices = []
             for node in nodes:
                 try:
@@ -70,15 +164,13 @@ class TibberHistoryHelper:
                     if not from_time_str:
                         continue
 
-                    # Convert ISO timestamp to datetime
-                    from_time = datetime.fromisoformat(
-                        from_time_str.replace("Z", "+00:00")
-                    )
-
-                    # Convert to local timezone
-                    local_time = dt_util.as_local(from_time)
+                    # Skip ~23/24 of the nodes before building any datetime
+                    if not _may_be_local_hour(from_time_str, target_hour, local_offsets):
+                        continue
 
-                    # Check if hour matches
+                    # Convert ISO timestamp (fromisoformat accepts a "Z" suffix)
+                    # to the local timezone and check if the hour matches
+                    local_time = fromisoformat(from_time_str).astimezone(local_tz)
                     if local_time.hour == target_hour:
                         # Get price (unitPrice + unitPriceVAT = total price)
                         unit_price = node.get("unitPrice")
@@ -86,10 +178,11 @@ class TibberHistoryHelper:
 
                         if unit_price is not None:
                             total_price = unit_price + unit_price_vat
-                            prices.append(total_price)
+                            prices.append((local_time.date(), total_price))
 
                 except (ValueError, TypeError, AttributeError) as err:
-                    _LOGGER.debug("Skipping invalid Tibber node: %s", err)
+                    if _LOGGER.isEnabledFor(logging.DEBUG):
+                        _LOGGER.debug("Skipping invalid Tibber node: %s", err)
                     continue
 
             _LOGGER.info(
@@ -115,6 +208,9 @@ class TibberHistoryHelper:
     ) -> dict[str, Any]:
         """Calculate average price for the current hour over the last N days.
 
+        Results are cached until the hour rolls over, since the same-hour
+        history does not change within an hour.
+
         Enhanced with Tibber API fallback to fetch missing historical data when
         recorder doesn't have sufficient samples.
 
@@ -140,44 +236,70 @@ class TibberHistoryHelper:
                 - tibber_count: (if mixed) Number of Tibber API samples
         """
         now = dt_util.now()
+        cache_key = (self.entity_id, now.strftime("%Y%m%d%H"), days)
+
+        if (cached := self._average_cache.get(cache_key)) is not None:
+            _LOGGER.debug("Using cached same-hour average for %s", self.entity_id)
+            return cached
+
+        result = await self._async_calculate_same_hour_average(
+            now, days, tibber_client, enable_fallback, min_samples, max_fetch_hours
+        )
+
+        # Only keep usable results; errors and empty history are retried
+        if result["average"] is not None:
+            cache = self._average_cache
+            for key in [key for key in cache if key[1] != cache_key[1]]:
+                del cache[key]
+            if len(cache) >= _AVERAGE_CACHE_SIZE:
+                del cache[next(iter(cache))]
+            cache[cache_key] = result
+
+        return result
+
+    async def _async_calculate_same_hour_average(
+        self,
+        now: datetime,
+        days: int,
+        tibber_client: "TibberApiClient | None",
+        enable_fallback: bool,
+        min_samples: int,
+        max_fetch_hours: int,
+    ) -> dict[str, Any]:
+        """Query recorder (and optionally Tibber) for the same-hour average."""
         current_hour = now.hour
 
-        # Calculate start time (N days ago)
-        end_time = now
-        start_time = now - timedelta(days=days)
+        windows = _same_hour_windows(now, days)
 
         _LOGGER.debug(
-            "Querying historical data for %s from %s to %s",
+            "Querying historical data for %s at hour %d over the last %d days",
             self.entity_id,
-            start_time,
-            end_time,
+            current_hour,
+            days,
         )
 
-        try:
-            # Step 1: Get recorder data
-            states = await self.hass.async_add_executor_job(
-                self._get_history_states,
-                start_time,
-                end_time,
+        # If the recorder was short last time it most likely still is, so start
+        # the Tibber request alongside the recorder query
+        tibber_task: asyncio.Task[list[tuple[date, float]]] | None = None
+        if enable_fallback and tibber_client and self._fallback_expected:
+            tibber_task = asyncio.create_task(
+                self.fetch_tibber_fallback(
+                    tibber_client=tibber_client,
+                    target_hour=current_hour,
+                    missing_days=days,
+                    max_hours=max_fetch_hours,
+                )
             )
 
-            # Filter states for the same hour and collect prices
-            recorder_prices = []
-
-            if states:
-                for state in states:
-                    # Skip if state is unavailable or unknown
-                    if state.state in ("unavailable", "unknown", None):
-                        continue
-
-                    # Check if state timestamp matches current hour
-                    state_time = state.last_updated.replace(tzinfo=dt_util.UTC)
-                    if state_time.hour == current_hour:
-                        try:
-                            price = float(state.state)
-                            recorder_prices.append(price)
-                        except (ValueError, TypeError):
-                            continue
+        try:
+            # Step 1: Get recorder data (already filtered to the current hour)
+            rows = await recorder.get_instance(self.hass).async_add_executor_job(
+                self._get_same_hour_states,
+                windows,
+            )
+            # At most one sample per local day
+            recorder_by_date = _prices_by_date(rows)
+            recorder_prices = list(recorder_by_date.values())
 
             _LOGGER.debug(
                 "Found %d recorder samples for hour %d",
@@ -186,6 +308,7 @@ class TibberHistoryHelper:
             )
 
             # Step 2: Check if fallback is needed
+            self._fallback_expected = len(recorder_prices) < min_samples
             if len(recorder_prices) >= min_samples or not enable_fallback:
                 # Sufficient recorder data or fallback disabled
                 if not recorder_prices:
@@ -222,9 +345,20 @@ class TibberHistoryHelper:
                 }
 
             # Step 3: Fetch Tibber fallback if client provided
-            tibber_prices = []
-            if tibber_client:
-                missing_days = max(1, days - len(recorder_prices))
+            tibber_dated: list[tuple[date, float]] = []
+            if tibber_task is not None:
+                tibber_dated = await tibber_task
+            elif tibber_client:
+                # Only look back as far as the oldest day the recorder misses
+                today = now.date()
+                missing_days = next(
+                    (
+                        day + 1
+                        for day in range(days - 1, -1, -1)
+                        if today - timedelta(days=day) not in recorder_by_date
+                    ),
+                    1,
+                )
 
                 _LOGGER.info(
                     "Recorder has insufficient samples (%d < %d), fetching Tibber API fallback",
@@ -232,14 +366,20 @@ class TibberHistoryHelper:
                     min_samples,
                 )
 
-                tibber_prices = await self.fetch_tibber_fallback(
+                tibber_dated = await self.fetch_tibber_fallback(
                     tibber_client=tibber_client,
                     target_hour=current_hour,
                     missing_days=missing_days,
                     max_hours=max_fetch_hours,
                 )
 
-            # Step 4: Merge and calculate statistics
+            # Step 4: Merge per day (recorder wins) and calculate statistics
+            tibber_by_date = {
+                day: price
+                for day, price in tibber_dated
+                if day not in recorder_by_date
+            }
+            tibber_prices = list(tibber_by_date.values())
             all_prices = recorder_prices + tibber_prices
 
             if not all_prices:
@@ -304,29 +444,43 @@ class TibberHistoryHelper:
                 "source": "error",
             }
 
-    def _get_history_states(
+        finally:
+            # Speculative Tibber request turned out to be unnecessary
+            if tibber_task is not None and not tibber_task.done():
+                tibber_task.cancel()
+
+    def _get_same_hour_states(
         self,
-        start_time: datetime,
-        end_time: datetime,
-    ) -> list[Any]:
-        """Get historical states from recorder (runs in executor).
+        windows: list[tuple[float, float]],
+    ) -> list[tuple[str | None, float]]:
+        """Get recorded state values within the given windows (runs in executor).
+
+        Filtering by hour happens in the database against the indexed
+        last_updated_ts column, so only matching rows are loaded.
 
         Args:
-            start_time: Start of the time range
-            end_time: End of the time range
+            windows: (start, end) UNIX timestamps, end exclusive
 
         Returns:
-            List of state objects
+            List of (raw state value, last_updated_ts) rows, oldest first
         """
-        # Use recorder history API to get states
-        history_list = history.get_significant_states(
-            self.hass,
-            start_time,
-            end_time,
-            entity_ids=[self.entity_id],
-            significant_changes_only=False,
+        query = (
+            select(States.state, States.last_updated_ts)
+            .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .where(StatesMeta.entity_id == self.entity_id)
+            .where(
+                or_(
+                    *(
+                        and_(
+                            States.last_updated_ts >= start,
+                            States.last_updated_ts < end,
+                        )
+                        for start, end in windows
+                    )
+                )
+            )
+            .order_by(States.last_updated_ts)
         )
 
-        # Extract states for our entity
-        states = history_list.get(self.entity_id, [])
-        return states
+        with session_scope(hass=self.hass, read_only=True) as session:
+            return [tuple(row) for row in session.execute(query)]
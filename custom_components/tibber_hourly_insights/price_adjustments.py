@@ -10,43 +10,94 @@ Calculation order:
 """
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime
 import logging
 from typing import Any
+from zoneinfo import ZoneInfo
 
-import pytz
+from .const import (
+    CONF_DAY_END_HOUR,
+    CONF_DAY_START_HOUR,
+    CONF_ENABLE_GRID_FEE,
+    CONF_ENABLE_SUBSIDY,
+    CONF_GRID_FEE_DAY,
+    CONF_GRID_FEE_NIGHT,
+    CONF_SUBSIDY_PERCENTAGE,
+    CONF_SUBSIDY_THRESHOLD,
+    DEFAULT_DAY_END_HOUR,
+    DEFAULT_DAY_START_HOUR,
+    DEFAULT_ENABLE_GRID_FEE,
+    DEFAULT_ENABLE_SUBSIDY,
+    DEFAULT_GRID_FEE_DAY,
+    DEFAULT_GRID_FEE_NIGHT,
+    DEFAULT_SUBSIDY_PERCENTAGE,
+    DEFAULT_SUBSIDY_THRESHOLD,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 # Oslo timezone for time-based calculations
-OSLO_TZ = pytz.timezone("Europe/Oslo")
+OSLO_TZ = ZoneInfo("Europe/Oslo")
+
+
+@dataclass(slots=True, frozen=True)
+class PriceAdjustmentConfig:
+    """Resolved price adjustment settings.
+
+    Attributes:
+        enable_subsidy: Whether to apply strømstøtte subsidy
+        subsidy_threshold: Threshold in NOK/kWh
+        subsidy_percentage: Percentage government covers above threshold
+        enable_grid_fee: Whether to add grid fees
+        grid_fee_day: Day rate grid fee in NOK/kWh
+        grid_fee_night: Night rate grid fee in NOK/kWh
+        day_start_hour: Hour when day rate starts
+        day_end_hour: Hour when day rate ends
+    """
+
+    enable_subsidy: bool = DEFAULT_ENABLE_SUBSIDY
+    subsidy_threshold: float = DEFAULT_SUBSIDY_THRESHOLD
+    subsidy_percentage: float = DEFAULT_SUBSIDY_PERCENTAGE
+    enable_grid_fee: bool = DEFAULT_ENABLE_GRID_FEE
+    grid_fee_day: float = DEFAULT_GRID_FEE_DAY
+    grid_fee_night: float = DEFAULT_GRID_FEE_NIGHT
+    day_start_hour: int = DEFAULT_DAY_START_HOUR
+    day_end_hour: int = DEFAULT_DAY_END_HOUR
+
+    @property
+    def any_enabled(self) -> bool:
+        """Return True if any adjustment is enabled."""
+        return self.enable_subsidy or self.enable_grid_fee
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> PriceAdjustmentConfig:
+        """Build the settings from config entry options."""
+        get = options.get
+        return cls(
+            enable_subsidy=get(CONF_ENABLE_SUBSIDY, DEFAULT_ENABLE_SUBSIDY),
+            subsidy_threshold=get(CONF_SUBSIDY_THRESHOLD, DEFAULT_SUBSIDY_THRESHOLD),
+            subsidy_percentage=get(CONF_SUBSIDY_PERCENTAGE, DEFAULT_SUBSIDY_PERCENTAGE),
+            enable_grid_fee=get(CONF_ENABLE_GRID_FEE, DEFAULT_ENABLE_GRID_FEE),
+            grid_fee_day=get(CONF_GRID_FEE_DAY, DEFAULT_GRID_FEE_DAY),
+            grid_fee_night=get(CONF_GRID_FEE_NIGHT, DEFAULT_GRID_FEE_NIGHT),
+            day_start_hour=get(CONF_DAY_START_HOUR, DEFAULT_DAY_START_HOUR),
+            day_end_hour=get(CONF_DAY_END_HOUR, DEFAULT_DAY_END_HOUR),
+        )
 
 
 def calculate_adjusted_price(
     spot_price: float,
     timestamp: datetime | str,
-    enable_subsidy: bool = False,
-    subsidy_threshold: float = 0.9375,
-    subsidy_percentage: float = 90.0,
-    enable_grid_fee: bool = False,
-    grid_fee_day: float = 0.444,
-    grid_fee_night: float = 0.305,
-    day_start_hour: int = 6,
-    day_end_hour: int = 22,
+    config: PriceAdjustmentConfig,
 ) -> dict[str, Any]:
     """Calculate adjusted price with subsidy and grid fees.
 
     Args:
         spot_price: Raw spot price in NOK/kWh
         timestamp: Timestamp for the price (datetime or ISO string)
-        enable_subsidy: Whether to apply strømstøtte subsidy
-        subsidy_threshold: Threshold in NOK/kWh (default: 0.9375)
-        subsidy_percentage: Percentage government covers above threshold (default: 90.0)
-        enable_grid_fee: Whether to add grid fees
-        grid_fee_day: Day rate grid fee in NOK/kWh (default: 0.444)
-        grid_fee_night: Night rate grid fee in NOK/kWh (default: 0.305)
-        day_start_hour: Hour when day rate starts (default: 6)
-        day_end_hour: Hour when day rate ends (default: 22)
+        config: Price adjustment settings
 
     Returns:
         dict with keys:
@@ -68,106 +119,159 @@ def calculate_adjusted_price(
 
     # Ensure timestamp is timezone-aware (convert to Oslo time)
     if timestamp.tzinfo is None:
-        timestamp = pytz.UTC.localize(timestamp)
+        timestamp = timestamp.replace(tzinfo=UTC)
     oslo_time = timestamp.astimezone(OSLO_TZ)
 
+    adjustment = calculate_adjusted_price_fast(spot_price, oslo_time.hour, config)
+
+    adjustment["timestamp"] = oslo_time.isoformat()
+
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(
+            "Price adjustment for %s: spot=%.4f, subsidy=%.4f, grid_fee=%.4f, final=%.4f",
+            adjustment["timestamp"],
+            spot_price,
+            adjustment["subsidy_amount"],
+            adjustment["grid_fee"],
+            adjustment["adjusted_price"],
+        )
+    return adjustment
+
+
+def calculate_adjusted_price_fast(
+    spot_price: float,
+    hour: int,
+    config: PriceAdjustmentConfig,
+) -> dict[str, Any]:
+    """Calculate adjusted price for a known Oslo hour, without timestamp parsing.
+
+    Args:
+        spot_price: Raw spot price in NOK/kWh
+        hour: Oslo local hour of the price (0-23)
+        config: Price adjustment settings
+
+    Returns:
+        dict with raw_spot_price, subsidy_amount, grid_fee and adjusted_price
+    """
     # Step 1: Apply strømstøtte (subsidy) if enabled
     subsidy_amount = 0.0
     price_after_subsidy = spot_price
 
-    if enable_subsidy and spot_price > subsidy_threshold:
-        excess = spot_price - subsidy_threshold
-        subsidy_amount = excess * (subsidy_percentage / 100.0)
+    if config.enable_subsidy and spot_price > config.subsidy_threshold:
+        excess = spot_price - config.subsidy_threshold
+        subsidy_amount = excess * (config.subsidy_percentage / 100.0)
         price_after_subsidy = spot_price - subsidy_amount
 
     # Step 2: Add time-based grid fee if enabled
     grid_fee = 0.0
     final_price = price_after_subsidy
 
-    if enable_grid_fee:
-        hour = oslo_time.hour
-        if day_start_hour <= hour < day_end_hour:
-            grid_fee = grid_fee_day
+    if config.enable_grid_fee:
+        if config.day_start_hour <= hour < config.day_end_hour:
+            grid_fee = config.grid_fee_day
         else:
-            grid_fee = grid_fee_night
+            grid_fee = config.grid_fee_night
         final_price = price_after_subsidy + grid_fee
 
-    _LOGGER.debug(
-        "Price adjustment for %s: spot=%.4f, subsidy=%.4f, grid_fee=%.4f, final=%.4f",
-        oslo_time.isoformat(),
-        spot_price,
-        subsidy_amount,
-        grid_fee,
-        final_price,
-    )
-
     return {
         "raw_spot_price": spot_price,
         "subsidy_amount": subsidy_amount,
         "grid_fee": grid_fee,
         "adjusted_price": final_price,
-        "timestamp": oslo_time.isoformat(),
     }
 
 
+def starts_at_hour(starts_at: str) -> int:
+    """Return the local hour of a Tibber startsAt timestamp.
+
+    Tibber always reports prices in the home's local time using a fixed
+    ISO format (e.g. 2024-01-01T13:00:00.000+01:00), so the hour can be
+    sliced instead of parsed.
+    """
+    return int(starts_at[11:13])
+
+
 def adjust_price_list(
     price_entries: list[dict[str, Any]],
-    enable_subsidy: bool = False,
-    subsidy_threshold: float = 0.9375,
-    subsidy_percentage: float = 90.0,
-    enable_grid_fee: bool = False,
-    grid_fee_day: float = 0.444,
-    grid_fee_night: float = 0.305,
-    day_start_hour: int = 6,
-    day_end_hour: int = 22,
+    config: PriceAdjustmentConfig,
 ) -> list[dict[str, Any]]:
     """Apply price adjustments to a list of price entries.
 
     Args:
         price_entries: List of price dicts from Tibber API (with 'total' and 'startsAt' keys)
-        enable_subsidy: Whether to apply strømstøtte subsidy
-        subsidy_threshold: Threshold in NOK/kWh
-        subsidy_percentage: Percentage government covers above threshold
-        enable_grid_fee: Whether to add grid fees
-        grid_fee_day: Day rate grid fee in NOK/kWh
-        grid_fee_night: Night rate grid fee in NOK/kWh
-        day_start_hour: Hour when day rate starts
-        day_end_hour: Hour when day rate ends
+        config: Price adjustment settings
 
     Returns:
         List of price dicts with adjusted 'total' values and additional adjustment details
     """
-    adjusted_entries = []
+    return list(iter_adjusted_prices(price_entries, config))
+
+
+def iter_adjusted_prices(
+    price_entries: Iterable[dict[str, Any]],
+    config: PriceAdjustmentConfig,
+) -> Iterator[dict[str, Any]]:
+    """Yield adjusted copies of price entries one at a time.
+
+    Streaming variant of adjust_price_list for callers that only iterate the
+    result once. Entries without 'total' or 'startsAt' are skipped.
+
+    Args:
+        price_entries: Price dicts from Tibber API (with 'total' and 'startsAt' keys)
+        config: Price adjustment settings
+    """
+    # Resolve per-hour fees and the subsidy factor once for the whole batch
+    fee_by_hour = _grid_fee_table(config)
+    enable_subsidy = config.enable_subsidy
+    threshold = config.subsidy_threshold
+    subsidy_factor = config.subsidy_percentage / 100.0
+
+    entry_count = 0
+    invalid_count = 0
 
     for entry in price_entries:
-        if not entry or "total" not in entry or "startsAt" not in entry:
-            _LOGGER.warning("Invalid price entry format: %s", entry)
+        entry_count += 1
+        if (
+            not entry
+            or (spot_price := entry.get("total")) is None
+            or (starts_at := entry.get("startsAt")) is None
+        ):
+            invalid_count += 1
             continue
 
-        spot_price = entry["total"]
-        timestamp = entry["startsAt"]
-
-        # Calculate adjustments
-        adjustment = calculate_adjusted_price(
-            spot_price=spot_price,
-            timestamp=timestamp,
-            enable_subsidy=enable_subsidy,
-            subsidy_threshold=subsidy_threshold,
-            subsidy_percentage=subsidy_percentage,
-            enable_grid_fee=enable_grid_fee,
-            grid_fee_day=grid_fee_day,
-            grid_fee_night=grid_fee_night,
-            day_start_hour=day_start_hour,
-            day_end_hour=day_end_hour,
-        )
+        subsidy_amount = 0.0
+        if enable_subsidy and spot_price > threshold:
+            subsidy_amount = (spot_price - threshold) * subsidy_factor
+
+        # Inlined starts_at_hour() to keep the loop on local lookups
+        grid_fee = fee_by_hour[int(starts_at[11:13])]
 
         # Create adjusted entry (keep original fields, update total)
-        adjusted_entry = entry.copy()
-        adjusted_entry["total"] = adjustment["adjusted_price"]
-        adjusted_entry["raw_spot_price"] = adjustment["raw_spot_price"]
-        adjusted_entry["subsidy_amount"] = adjustment["subsidy_amount"]
-        adjusted_entry["grid_fee"] = adjustment["grid_fee"]
+        yield {
+            **entry,
+            "total": spot_price - subsidy_amount + grid_fee,
+            "raw_spot_price": spot_price,
+            "subsidy_amount": subsidy_amount,
+            "grid_fee": grid_fee,
+        }
 
-        adjusted_entries.append(adjusted_entry)
+    # One warning per batch so partial API responses don't flood the log
+    if invalid_count:
+        _LOGGER.warning(
+            "Skipped %d of %d price entries with missing total or startsAt",
+            invalid_count,
+            entry_count,
+        )
+
+
+def _grid_fee_table(config: PriceAdjustmentConfig) -> tuple[float, ...]:
+    """Return the grid fee for each Oslo hour of the day (0.0 if disabled)."""
+    if not config.enable_grid_fee:
+        return (0.0,) * 24
+    return tuple(
+        config.grid_fee_day
+        if config.day_start_hour <= hour < config.day_end_hour
+        else config.grid_fee_night
+        for hour in range(24)
+    )
 
-    return adjusted_entries
@@ -1,8 +1,11 @@
 """Sensor platform for Tibber Hourly Insights."""
 from __future__ import annotations
 
-from datetime import datetime
+from bisect import bisect_left
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
 import logging
+from types import MappingProxyType
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -14,7 +17,6 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-import homeassistant.util.dt as dt_util
 
 from .const import (
     ATTR_48H_CONTRIBUTION,
@@ -23,6 +25,7 @@ from .const import (
     ATTR_AVG_PRICE_48H,
     ATTR_BASELINE_PRICE,
     ATTR_COMPARISON,
+    ATTR_COMPARISON_DISPLAY,
     ATTR_CURRENCY,
     ATTR_DATA_SOURCE,
     ATTR_DIFFERENCE_PERCENT,
@@ -41,10 +44,7 @@ from .const import (
     ATTR_WEIGHTS_USED,
     CONF_CHEAP_PCT,
     CONF_ENABLE_30D_BASELINE,
-    CONF_ENABLE_TIBBER_FALLBACK,
     CONF_EXPENSIVE_PCT,
-    CONF_FALLBACK_MAX_FETCH_HOURS,
-    CONF_FALLBACK_MIN_SAMPLES,
     CONF_NORMAL_PCT,
     CONF_VERY_CHEAP_PCT,
     CONF_VERY_EXPENSIVE_PCT,
@@ -53,26 +53,32 @@ from .const import (
     CONF_WEIGHT_TIBBER,
     DEFAULT_CHEAP_PCT,
     DEFAULT_ENABLE_30D_BASELINE,
-    DEFAULT_ENABLE_TIBBER_FALLBACK,
     DEFAULT_EXPENSIVE_PCT,
-    DEFAULT_FALLBACK_MAX_FETCH_HOURS,
-    DEFAULT_FALLBACK_MIN_SAMPLES,
     DEFAULT_NORMAL_PCT,
     DEFAULT_VERY_CHEAP_PCT,
     DEFAULT_VERY_EXPENSIVE_PCT,
     DEFAULT_WEIGHT_48H,
     DEFAULT_WEIGHT_30D,
     DEFAULT_WEIGHT_TIBBER,
-    DOMAIN,
-    ENTRY_DATA_COORDINATOR,
     PRICE_CATEGORY_CHEAP_THRESHOLD,
     PRICE_CATEGORY_EXPENSIVE_THRESHOLD,
 )
 from .coordinator import TibberDataUpdateCoordinator
-from .history import TibberHistoryHelper
 
 _LOGGER = logging.getLogger(__name__)
 
+# Shared read-only stand-in for a missing "current" entry
+_NO_CURRENT: Mapping[str, Any] = MappingProxyType({})
+
+# Human-readable descriptions of Tibber's price levels
+_LEVEL_DESCRIPTIONS = {
+    "VERY_CHEAP": "Very cheap electricity price",
+    "CHEAP": "Cheap electricity price",
+    "NORMAL": "Normal electricity price",
+    "EXPENSIVE": "Expensive electricity price",
+    "VERY_EXPENSIVE": "Very expensive electricity price",
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -80,25 +86,76 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up Tibber sensor from a config entry."""
-    coordinator = hass.data[DOMAIN][entry.entry_id][ENTRY_DATA_COORDINATOR]
+    coordinator: TibberDataUpdateCoordinator = entry.runtime_data
 
     # Create core sensors (always created)
     sensors = [
         TibberCurrentPriceSensor(coordinator, entry),
         TibberApiPriceLevelSensor(coordinator, entry),
         Tibber48HourComparisonSensor(coordinator, entry),
-        TibberWeightedConsensusSensor(coordinator, entry, hass),
+        TibberWeightedConsensusSensor(coordinator, entry),
     ]
 
     # Conditionally add 30d baseline sensor if enabled in options
     enable_30d = entry.options.get(CONF_ENABLE_30D_BASELINE, DEFAULT_ENABLE_30D_BASELINE)
     if enable_30d:
-        sensors.append(Tibber30DayBaselineSensor(coordinator, entry, hass))
+        sensors.append(Tibber30DayBaselineSensor(coordinator, entry))
 
     async_add_entities(sensors, True)
 
 
-class TibberCurrentPriceSensor(CoordinatorEntity[TibberDataUpdateCoordinator], SensorEntity):
+def _current(data: dict[str, Any]) -> Mapping[str, Any]:
+    """Return the current price entry of the coordinator data."""
+    return data.get("current") or _NO_CURRENT
+
+
+def _baseline_diff_percent(data: dict[str, Any]) -> float | None:
+    """Return the current price's difference from the 30-day baseline in percent."""
+    baseline_data = data.get("baseline_30d")
+    if not baseline_data:
+        return None
+
+    current_price = _current(data).get("total")
+    baseline_price = baseline_data.get("average")
+    if current_price is None or not baseline_price:
+        return None
+
+    return ((current_price - baseline_price) / baseline_price) * 100
+
+
+class _CachedAttributesMixin:
+    """Reuse extra_state_attributes until the coordinator publishes new data.
+
+    Subclasses implement _build_extra_state_attributes.
+    """
+
+    _attributes_cache: tuple[dict[str, Any], dict[str, Any] | None] | None = None
+    _build_extra_state_attributes: Callable[
+        [dict[str, Any]], dict[str, Any] | None
+    ]
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return additional attributes."""
+        data = self.coordinator.data
+        if data is None:
+            return None
+
+        # Holding a reference to the data keeps the identity check sound
+        cached = self._attributes_cache
+        if cached is not None and cached[0] is data:
+            return cached[1]
+
+        attributes = self._build_extra_state_attributes(data)
+        self._attributes_cache = (data, attributes)
+        return attributes
+
+
+class TibberCurrentPriceSensor(
+    _CachedAttributesMixin,
+    CoordinatorEntity[TibberDataUpdateCoordinator],
+    SensorEntity,
+):
     """Sensor representing the current electricity price from Tibber."""
 
     _attr_has_entity_name = True
@@ -121,7 +178,7 @@ class TibberCurrentPriceSensor(CoordinatorEntity[TibberDataUpdateCoordinator], S
         if self.coordinator.data is None:
             return None
 
-        current = self.coordinator.data.get("current", {})
+        current = _current(self.coordinator.data)
         price = current.get("total")
         if price is None:
             _LOGGER.warning("No price data available from coordinator")
@@ -135,17 +192,13 @@ class TibberCurrentPriceSensor(CoordinatorEntity[TibberDataUpdateCoordinator], S
         if self.coordinator.data is None:
             return None
 
-        current = self.coordinator.data.get("current", {})
+        current = _current(self.coordinator.data)
         currency = current.get("currency", "NOK")
         return f"{currency}/kWh"
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return additional attributes."""
-        if self.coordinator.data is None:
-            return None
-
-        current = self.coordinator.data.get("current", {})
+    def _build_extra_state_attributes(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """Build additional attributes."""
+        current = _current(data)
 
         attributes = {
             ATTR_CURRENCY: current.get("currency"),
@@ -166,11 +219,15 @@ class TibberCurrentPriceSensor(CoordinatorEntity[TibberDataUpdateCoordinator], S
         return (
             self.coordinator.last_update_success
             and self.coordinator.data is not None
-            and self.coordinator.data.get("current", {}).get("total") is not None
+            and self.coordinator.data["has_current_price"]
         )
 
 
-class TibberApiPriceLevelSensor(CoordinatorEntity[TibberDataUpdateCoordinator], SensorEntity):
+class TibberApiPriceLevelSensor(
+    _CachedAttributesMixin,
+    CoordinatorEntity[TibberDataUpdateCoordinator],
+    SensorEntity,
+):
     """Sensor showing Tibber's native price level classification."""
 
     _attr_has_entity_name = True
@@ -193,16 +250,12 @@ class TibberApiPriceLevelSensor(CoordinatorEntity[TibberDataUpdateCoordinator],
         if self.coordinator.data is None:
             return None
 
-        current = self.coordinator.data.get("current", {})
+        current = _current(self.coordinator.data)
         return current.get("level")
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return additional attributes."""
-        if self.coordinator.data is None:
-            return None
-
-        current = self.coordinator.data.get("current", {})
+    def _build_extra_state_attributes(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """Build additional attributes."""
+        current = _current(data)
         return {
             "current_price": current.get("total"),
             ATTR_CURRENCY: current.get("currency"),
@@ -215,22 +268,19 @@ class TibberApiPriceLevelSensor(CoordinatorEntity[TibberDataUpdateCoordinator],
         return (
             self.coordinator.last_update_success
             and self.coordinator.data is not None
-            and self.coordinator.data.get("current", {}).get("level") is not None
+            and self.coordinator.data["has_level"]
         )
 
     def _get_level_description(self, level: str | None) -> str:
         """Get human-readable description of price level."""
-        descriptions = {
-            "VERY_CHEAP": "Very cheap electricity price",
-            "CHEAP": "Cheap electricity price",
-            "NORMAL": "Normal electricity price",
-            "EXPENSIVE": "Expensive electricity price",
-            "VERY_EXPENSIVE": "Very expensive electricity price",
-        }
-        return descriptions.get(level, "Unknown")
+        return _LEVEL_DESCRIPTIONS.get(level, "Unknown")
 
 
-class Tibber48HourComparisonSensor(CoordinatorEntity[TibberDataUpdateCoordinator], SensorEntity):
+class Tibber48HourComparisonSensor(
+    _CachedAttributesMixin,
+    CoordinatorEntity[TibberDataUpdateCoordinator],
+    SensorEntity,
+):
     """Sensor comparing current price to 48-hour window (today+tomorrow or yesterday+today)."""
 
     _attr_has_entity_name = True
@@ -254,51 +304,43 @@ class Tibber48HourComparisonSensor(CoordinatorEntity[TibberDataUpdateCoordinator
         if self.coordinator.data is None:
             return None
 
-        current = self.coordinator.data.get("current", {})
+        current = _current(self.coordinator.data)
         current_price = current.get("total")
         if current_price is None:
             return None
 
-        # Get 48-hour price window
-        prices_48h = self._get_48h_prices()
-        if not prices_48h:
+        # 48-hour price window, computed once per update by the coordinator
+        stats = self.coordinator.data.get("stats_48h")
+        if not stats:
             return None
 
         # Calculate percentile
-        percentile = self._calculate_percentile(current_price, prices_48h)
+        percentile = self._calculate_percentile(current_price, stats["sorted_prices"])
         return round(percentile, 1)
 
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return additional attributes."""
-        if self.coordinator.data is None:
-            return None
-
-        current = self.coordinator.data.get("current", {})
+    def _build_extra_state_attributes(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """Build additional attributes."""
+        current = _current(data)
         current_price = current.get("total")
         if current_price is None:
             return None
 
-        prices_48h = self._get_48h_prices()
-        if not prices_48h:
+        stats = data.get("stats_48h")
+        if not stats:
             return None
 
-        percentile = self._calculate_percentile(current_price, prices_48h)
+        percentile = self._calculate_percentile(current_price, stats["sorted_prices"])
         price_category = self._get_price_category(percentile)
-        pct_vs_avg = self._calculate_pct_vs_average(current_price, prices_48h)
-
-        tomorrow = self.coordinator.data.get("tomorrow", [])
-        data_source = "today+tomorrow" if tomorrow else "yesterday+today"
 
         return {
             ATTR_PRICE_CATEGORY: price_category,
             ATTR_PERCENTILE: round(percentile, 1),
-            ATTR_PCT_VS_AVERAGE_48H: round(pct_vs_avg, 2),
+            ATTR_PCT_VS_AVERAGE_48H: round(stats["pct_vs_avg"], 2),
             "current_price": current_price,
-            ATTR_MIN_PRICE_48H: round(min(prices_48h), 4),
-            ATTR_MAX_PRICE_48H: round(max(prices_48h), 4),
-            ATTR_AVG_PRICE_48H: round(sum(prices_48h) / len(prices_48h), 4),
-            ATTR_DATA_SOURCE: data_source,
+            ATTR_MIN_PRICE_48H: round(stats["min"], 4),
+            ATTR_MAX_PRICE_48H: round(stats["max"], 4),
+            ATTR_AVG_PRICE_48H: round(stats["avg"], 4),
+            ATTR_DATA_SOURCE: stats["source"],
             ATTR_CURRENCY: current.get("currency"),
         }
 
@@ -308,55 +350,22 @@ class Tibber48HourComparisonSensor(CoordinatorEntity[TibberDataUpdateCoordinator
         if not self.coordinator.last_update_success or self.coordinator.data is None:
             return False
 
-        current = self.coordinator.data.get("current", {})
-        if current.get("total") is None:
+        if not self.coordinator.data["has_current_price"]:
             return False
 
         # Need at least today's prices
-        today = self.coordinator.data.get("today", [])
-        return len(today) > 0
-
-    def _get_48h_prices(self) -> list[float]:
-        """Get 48 hours of price data.
-
-        Returns list of prices from either:
-        - today + tomorrow (after ~13:00 when tomorrow is available)
-        - yesterday + today (before tomorrow is available)
-        """
-        today = self.coordinator.data.get("today", [])
-        tomorrow = self.coordinator.data.get("tomorrow", [])
-        yesterday = self.coordinator.data.get("yesterday", [])
-
-        prices = []
-
-        if tomorrow:
-            # Use today + tomorrow
-            for entry in today + tomorrow:
-                if entry.get("total") is not None:
-                    prices.append(entry["total"])
-        elif yesterday:
-            # Use yesterday + today
-            for entry in yesterday + today:
-                if entry.get("total") is not None:
-                    prices.append(entry["total"])
-        else:
-            # Fallback to just today if no other data available
-            for entry in today:
-                if entry.get("total") is not None:
-                    prices.append(entry["total"])
+        return bool(self.coordinator.data.get("today"))
 
-        return prices
-
-    def _calculate_percentile(self, current_price: float, prices: list[float]) -> float:
-        """Calculate percentile rank of current price in price list."""
-        if not prices:
+    def _calculate_percentile(self, current_price: float, sorted_prices: list[float]) -> float:
+        """Calculate percentile rank of current price in an ascending price list."""
+        if not sorted_prices:
             return 50.0  # Default to middle if no data
 
         # Count how many prices are less than current price
-        count_below = sum(1 for p in prices if p < current_price)
+        count_below = bisect_left(sorted_prices, current_price)
 
         # Calculate percentile (0-100)
-        percentile = (count_below / len(prices)) * 100
+        percentile = (count_below / len(sorted_prices)) * 100
         return percentile
 
     def _get_price_category(self, percentile: float) -> str:
@@ -368,33 +377,22 @@ class Tibber48HourComparisonSensor(CoordinatorEntity[TibberDataUpdateCoordinator
         else:
             return "expensive"
 
-    def _calculate_pct_vs_average(self, current_price: float, prices: list[float]) -> float:
-        """Calculate percentage difference from 48h average.
-
-        Returns:
-            Percentage difference (e.g., 12.5 means 12.5% more expensive than average)
-        """
-        if not prices:
-            return 0.0
-
-        avg_price = sum(prices) / len(prices)
-        if avg_price == 0:
-            return 0.0
-
-        pct_diff = ((current_price - avg_price) / avg_price) * 100
-        return pct_diff
 
-
-class Tibber30DayBaselineSensor(CoordinatorEntity[TibberDataUpdateCoordinator], SensorEntity):
+class Tibber30DayBaselineSensor(
+    _CachedAttributesMixin,
+    CoordinatorEntity[TibberDataUpdateCoordinator],
+    SensorEntity,
+):
     """Sensor comparing current price to 30-day baseline for same hour."""
 
     _attr_has_entity_name = True
+    _attr_native_unit_of_measurement = "%"
+    _attr_state_class = SensorStateClass.MEASUREMENT
 
     def __init__(
         self,
         coordinator: TibberDataUpdateCoordinator,
         entry: ConfigEntry,
-        hass: HomeAssistant,
     ) -> None:
         """Initialize the sensor."""
         super().__init__(coordinator)
@@ -402,88 +400,23 @@ class Tibber30DayBaselineSensor(CoordinatorEntity[TibberDataUpdateCoordinator],
         self._attr_unique_id = f"{entry.entry_id}_30d_baseline"
         self._attr_name = "30-Day Baseline Comparison"
         self._attr_icon = "mdi:chart-line"
-        self._hass = hass
-        self._entry = entry
-        self._history_helper: TibberHistoryHelper | None = None
-        self._baseline_data: dict[str, Any] | None = None
-
-    async def async_added_to_hass(self) -> None:
-        """When entity is added to hass."""
-        await super().async_added_to_hass()
-
-        # Initialize history helper
-        current_price_entity = f"sensor.tibber_current_price"
-        self._history_helper = TibberHistoryHelper(self._hass, current_price_entity)
-
-        # Fetch initial baseline data
-        await self._update_baseline()
-
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        await super().async_update()
-        await self._update_baseline()
-
-    async def _update_baseline(self) -> None:
-        """Update the 30-day baseline data with optional Tibber API fallback."""
-        if self._history_helper is None:
-            return
-
-        # Get fallback configuration from options
-        options = self._entry.options
-        enable_fallback = options.get(
-            CONF_ENABLE_TIBBER_FALLBACK, DEFAULT_ENABLE_TIBBER_FALLBACK
-        )
-        min_samples = options.get(
-            CONF_FALLBACK_MIN_SAMPLES, DEFAULT_FALLBACK_MIN_SAMPLES
-        )
-        max_fetch_hours = options.get(
-            CONF_FALLBACK_MAX_FETCH_HOURS, DEFAULT_FALLBACK_MAX_FETCH_HOURS
-        )
-
-        # Get Tibber client from coordinator if fallback is enabled
-        tibber_client = self.coordinator.client if enable_fallback else None
-
-        try:
-            self._baseline_data = await self._history_helper.get_same_hour_average(
-                days=30,
-                tibber_client=tibber_client,
-                enable_fallback=enable_fallback,
-                min_samples=min_samples,
-                max_fetch_hours=max_fetch_hours,
-            )
-        except Exception as err:
-            _LOGGER.error("Error updating 30-day baseline: %s", err)
-            self._baseline_data = None
 
     @property
-    def native_value(self) -> str | None:
+    def native_value(self) -> float | None:
         """Return the percentage difference from baseline."""
-        if self.coordinator.data is None or self._baseline_data is None:
+        if self.coordinator.data is None:
             return None
 
-        current = self.coordinator.data.get("current", {})
-        current_price = current.get("total")
-        baseline_price = self._baseline_data.get("average")
-
-        if current_price is None or baseline_price is None:
+        # Baseline is fetched by the coordinator on each refresh
+        diff_percent = _baseline_diff_percent(self.coordinator.data)
+        if diff_percent is None:
             return None
 
-        # Calculate percentage difference
-        diff_percent = ((current_price - baseline_price) / baseline_price) * 100
-
-        # Format as string with sign
-        if diff_percent > 0:
-            return f"+{diff_percent:.1f}%"
-        else:
-            return f"{diff_percent:.1f}%"
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return additional attributes."""
-        if self.coordinator.data is None:
-            return None
+        return round(diff_percent, 1)
 
-        current = self.coordinator.data.get("current", {})
+    def _build_extra_state_attributes(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """Build additional attributes."""
+        current = _current(data)
         current_price = current.get("total")
 
         if current_price is None:
@@ -494,26 +427,25 @@ class Tibber30DayBaselineSensor(CoordinatorEntity[TibberDataUpdateCoordinator],
             ATTR_CURRENCY: current.get("currency"),
         }
 
-        if self._baseline_data:
-            baseline_price = self._baseline_data.get("average")
-            sample_count = self._baseline_data.get("sample_count", 0)
-            data_source = self._baseline_data.get("source", "recorder")
-
-            if baseline_price is not None:
-                diff_percent = ((current_price - baseline_price) / baseline_price) * 100
-
-                attrs.update({
-                    ATTR_BASELINE_PRICE: round(baseline_price, 4),
-                    ATTR_COMPARISON: self._get_comparison_text(diff_percent),
-                    ATTR_DIFFERENCE_PERCENT: round(diff_percent, 1),
-                    ATTR_SAMPLE_COUNT: sample_count,
-                    ATTR_DATA_SOURCE: data_source,
-                })
-
-                # Add breakdown for mixed sources
-                if data_source == "mixed":
-                    attrs["recorder_samples"] = self._baseline_data.get("recorder_count", 0)
-                    attrs["tibber_samples"] = self._baseline_data.get("tibber_count", 0)
+        baseline_data = data.get("baseline_30d")
+        diff_percent = _baseline_diff_percent(data)
+        if diff_percent is not None:
+            data_source = baseline_data.get("source", "recorder")
+
+            attrs.update({
+                ATTR_BASELINE_PRICE: round(baseline_data["average"], 4),
+                ATTR_COMPARISON: self._get_comparison_text(diff_percent),
+                # Signed display string, formerly the sensor state
+                ATTR_COMPARISON_DISPLAY: f"{diff_percent:+.1f}%",
+                ATTR_DIFFERENCE_PERCENT: round(diff_percent, 1),
+                ATTR_SAMPLE_COUNT: baseline_data.get("sample_count", 0),
+                ATTR_DATA_SOURCE: data_source,
+            })
+
+            # Add breakdown for mixed sources
+            if data_source == "mixed":
+                attrs["recorder_samples"] = baseline_data.get("recorder_count", 0)
+                attrs["tibber_samples"] = baseline_data.get("tibber_count", 0)
 
         return attrs
 
@@ -523,8 +455,7 @@ class Tibber30DayBaselineSensor(CoordinatorEntity[TibberDataUpdateCoordinator],
         if not self.coordinator.last_update_success or self.coordinator.data is None:
             return False
 
-        current = self.coordinator.data.get("current", {})
-        if current.get("total") is None:
+        if not self.coordinator.data["has_current_price"]:
             return False
 
         # Initially available even without baseline data
@@ -540,7 +471,27 @@ class Tibber30DayBaselineSensor(CoordinatorEntity[TibberDataUpdateCoordinator],
         else:
             return "more expensive"
 
-class TibberWeightedConsensusSensor(CoordinatorEntity[TibberDataUpdateCoordinator], SensorEntity):
+
+@dataclass(slots=True, frozen=True)
+class _ConsensusState:
+    """Consensus score with the inputs it was computed from.
+
+    Attributes:
+        score: Decimal percentage score (None if no inputs are available)
+        metrics: Available inputs as percentages, keyed by source
+        normalized_weights: Weights renormalized over the available inputs
+    """
+
+    score: float | None
+    metrics: dict[str, float]
+    normalized_weights: dict[str, float]
+
+
+class TibberWeightedConsensusSensor(
+    _CachedAttributesMixin,
+    CoordinatorEntity[TibberDataUpdateCoordinator],
+    SensorEntity,
+):
     """Weighted consensus price score combining Tibber API, 48h, and 30d metrics."""
 
     _attr_has_entity_name = True
@@ -551,15 +502,31 @@ class TibberWeightedConsensusSensor(CoordinatorEntity[TibberDataUpdateCoordinato
         self,
         coordinator: TibberDataUpdateCoordinator,
         entry: ConfigEntry,
-        hass: HomeAssistant,
     ) -> None:
         """Initialize the consensus sensor."""
         super().__init__(coordinator)
 
         self._attr_unique_id = f"{entry.entry_id}_price_consensus"
         self._attr_name = "Price Consensus"
-        self._hass = hass
-        self._entry = entry
+
+        # Options changes reload the entry, so these are resolved once per setup
+        options = entry.options
+        self._weights = {
+            "tibber": options.get(CONF_WEIGHT_TIBBER, DEFAULT_WEIGHT_TIBBER),
+            "48h": options.get(CONF_WEIGHT_48H, DEFAULT_WEIGHT_48H),
+            "30d": options.get(CONF_WEIGHT_30D, DEFAULT_WEIGHT_30D),
+        }
+        self._enum_map = {
+            "VERY_CHEAP": options.get(CONF_VERY_CHEAP_PCT, DEFAULT_VERY_CHEAP_PCT),
+            "CHEAP": options.get(CONF_CHEAP_PCT, DEFAULT_CHEAP_PCT),
+            "NORMAL": options.get(CONF_NORMAL_PCT, DEFAULT_NORMAL_PCT),
+            "EXPENSIVE": options.get(CONF_EXPENSIVE_PCT, DEFAULT_EXPENSIVE_PCT),
+            "VERY_EXPENSIVE": options.get(CONF_VERY_EXPENSIVE_PCT, DEFAULT_VERY_EXPENSIVE_PCT),
+        }
+        self._enable_30d = options.get(
+            CONF_ENABLE_30D_BASELINE, DEFAULT_ENABLE_30D_BASELINE
+        )
+        self._state_cache: tuple[dict[str, Any], _ConsensusState] | None = None
 
     @property
     def native_value(self) -> float | None:
@@ -569,128 +536,85 @@ class TibberWeightedConsensusSensor(CoordinatorEntity[TibberDataUpdateCoordinato
         +0.3 = 30% more expensive than normal
         -0.25 = 25% cheaper than normal
         """
-        if self.coordinator.data is None:
+        data = self.coordinator.data
+        if data is None:
             return None
 
-        # Get configuration options
-        options = self._entry.options
-        weights = {
-            "tibber": options.get(CONF_WEIGHT_TIBBER, DEFAULT_WEIGHT_TIBBER),
-            "48h": options.get(CONF_WEIGHT_48H, DEFAULT_WEIGHT_48H),
-            "30d": options.get(CONF_WEIGHT_30D, DEFAULT_WEIGHT_30D),
-        }
-        enum_map = {
-            "VERY_CHEAP": options.get(CONF_VERY_CHEAP_PCT, DEFAULT_VERY_CHEAP_PCT),
-            "CHEAP": options.get(CONF_CHEAP_PCT, DEFAULT_CHEAP_PCT),
-            "NORMAL": options.get(CONF_NORMAL_PCT, DEFAULT_NORMAL_PCT),
-            "EXPENSIVE": options.get(CONF_EXPENSIVE_PCT, DEFAULT_EXPENSIVE_PCT),
-            "VERY_EXPENSIVE": options.get(CONF_VERY_EXPENSIVE_PCT, DEFAULT_VERY_EXPENSIVE_PCT),
+        return self._get_state(data).score
+
+    def _build_extra_state_attributes(self, data: dict[str, Any]) -> dict[str, Any] | None:
+        """Build detailed breakdown attributes."""
+        state = self._get_state(data)
+        current = _current(data)
+        metrics = state.metrics
+        tibber_pct = metrics.get("tibber")
+        pct_48h = metrics.get("48h")
+        pct_30d = metrics.get("30d")
+
+        return {
+            ATTR_TIBBER_CONTRIBUTION: round(tibber_pct, 2) if tibber_pct is not None else None,
+            ATTR_48H_CONTRIBUTION: round(pct_48h, 2) if pct_48h is not None else None,
+            ATTR_30D_CONTRIBUTION: round(pct_30d, 2) if pct_30d is not None else None,
+            ATTR_WEIGHTS_USED: {k: round(v, 3) for k, v in state.normalized_weights.items()},
+            ATTR_AVAILABLE_INPUTS: list(metrics.keys()),
+            ATTR_SCORE_DESCRIPTION: self._get_score_description(state.score or 0.0),
+            "current_price": current.get("total"),
+            ATTR_CURRENCY: current.get("currency"),
         }
-        enable_30d = options.get(CONF_ENABLE_30D_BASELINE, DEFAULT_ENABLE_30D_BASELINE)
 
+    def _get_state(self, data: dict[str, Any]) -> _ConsensusState:
+        """Return the consensus state for the data, computed once per update."""
+        cached = self._state_cache
+        if cached is not None and cached[0] is data:
+            return cached[1]
+
+        state = self._compute_state(data)
+        self._state_cache = (data, state)
+        return state
+
+    def _compute_state(self, data: dict[str, Any]) -> _ConsensusState:
+        """Compute the consensus score and its inputs."""
         # 1. Collect available metrics as percentages
-        metrics = {}
+        metrics: dict[str, float] = {}
+        current = _current(data)
 
         # Tibber enum → percentage
-        tibber_level = self.coordinator.data.get("current", {}).get("level")
+        tibber_level = current.get("level")
         if tibber_level:
-            metrics["tibber"] = enum_map.get(tibber_level, 0.0)
+            metrics["tibber"] = self._enum_map.get(tibber_level, 0.0)
 
-        # 48h comparison → % vs average (from attributes)
-        prices_48h = self._get_48h_prices()
-        current_price = self.coordinator.data.get("current", {}).get("total")
-        if current_price and prices_48h:
-            pct_48h = self._calculate_pct_vs_average(current_price, prices_48h)
-            metrics["48h"] = pct_48h
+        # 48h comparison → % vs average (shared coordinator statistics)
+        stats_48h = data.get("stats_48h")
+        if current.get("total") and stats_48h:
+            metrics["48h"] = stats_48h["pct_vs_avg"]
 
         # 30d baseline → % vs baseline (if enabled and available)
-        if enable_30d:
-            pct_30d = self._get_30d_percentage()
+        if self._enable_30d:
+            pct_30d = _baseline_diff_percent(data)
             if pct_30d is not None:
                 metrics["30d"] = pct_30d
 
         if not metrics:
-            return None
+            return _ConsensusState(None, metrics, {})
 
         # 2. Renormalize weights for available inputs
-        active_weights = {k: weights[k] for k in metrics.keys()}
+        weights = self._weights
+        active_weights = {k: weights[k] for k in metrics}
         total_weight = sum(active_weights.values())
 
         if total_weight == 0:
-            return 0.0  # Fallback to neutral (0 = normal)
+            return _ConsensusState(0.0, metrics, {})  # Fallback to neutral (0 = normal)
 
         normalized_weights = {k: v / total_weight for k, v in active_weights.items()}
 
         # 3. Calculate weighted average percentage
-        weighted_pct = sum(metrics[k] * normalized_weights[k] for k in metrics.keys())
+        weighted_pct = sum(metrics[k] * normalized_weights[k] for k in metrics)
 
         # 4. Return as decimal percentage (0.0 = normal, +0.3 = 30% more expensive, -0.25 = 25% cheaper)
         # Convert from percentage to decimal: divide by 100
         score = weighted_pct / 100.0
 
-        return round(score, 3)
-
-    @property
-    def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return detailed breakdown attributes."""
-        if self.coordinator.data is None:
-            return None
-
-        options = self._entry.options
-        weights = {
-            "tibber": options.get(CONF_WEIGHT_TIBBER, DEFAULT_WEIGHT_TIBBER),
-            "48h": options.get(CONF_WEIGHT_48H, DEFAULT_WEIGHT_48H),
-            "30d": options.get(CONF_WEIGHT_30D, DEFAULT_WEIGHT_30D),
-        }
-        enum_map = {
-            "VERY_CHEAP": options.get(CONF_VERY_CHEAP_PCT, DEFAULT_VERY_CHEAP_PCT),
-            "CHEAP": options.get(CONF_CHEAP_PCT, DEFAULT_CHEAP_PCT),
-            "NORMAL": options.get(CONF_NORMAL_PCT, DEFAULT_NORMAL_PCT),
-            "EXPENSIVE": options.get(CONF_EXPENSIVE_PCT, DEFAULT_EXPENSIVE_PCT),
-            "VERY_EXPENSIVE": options.get(CONF_VERY_EXPENSIVE_PCT, DEFAULT_VERY_EXPENSIVE_PCT),
-        }
-        enable_30d = options.get(CONF_ENABLE_30D_BASELINE, DEFAULT_ENABLE_30D_BASELINE)
-
-        # Collect metrics
-        metrics = {}
-        tibber_pct = None
-        pct_48h = None
-        pct_30d = None
-
-        tibber_level = self.coordinator.data.get("current", {}).get("level")
-        if tibber_level:
-            tibber_pct = enum_map.get(tibber_level, 0.0)
-            metrics["tibber"] = tibber_pct
-
-        prices_48h = self._get_48h_prices()
-        current_price = self.coordinator.data.get("current", {}).get("total")
-        if current_price and prices_48h:
-            pct_48h = self._calculate_pct_vs_average(current_price, prices_48h)
-            metrics["48h"] = pct_48h
-
-        if enable_30d:
-            pct_30d = self._get_30d_percentage()
-            if pct_30d is not None:
-                metrics["30d"] = pct_30d
-
-        # Calculate normalized weights
-        active_weights = {k: weights[k] for k in metrics.keys()}
-        total_weight = sum(active_weights.values())
-        normalized_weights = {k: v / total_weight for k, v in active_weights.items()} if total_weight > 0 else {}
-
-        # Get score
-        score = self.native_value or 0.0
-
-        return {
-            ATTR_TIBBER_CONTRIBUTION: round(tibber_pct, 2) if tibber_pct is not None else None,
-            ATTR_48H_CONTRIBUTION: round(pct_48h, 2) if pct_48h is not None else None,
-            ATTR_30D_CONTRIBUTION: round(pct_30d, 2) if pct_30d is not None else None,
-            ATTR_WEIGHTS_USED: {k: round(v, 3) for k, v in normalized_weights.items()},
-            ATTR_AVAILABLE_INPUTS: list(metrics.keys()),
-            ATTR_SCORE_DESCRIPTION: self._get_score_description(score),
-            "current_price": current_price,
-            ATTR_CURRENCY: self.coordinator.data.get("current", {}).get("currency"),
-        }
+        return _ConsensusState(round(score, 3), metrics, normalized_weights)
 
     @property
     def available(self) -> bool:
@@ -698,65 +622,8 @@ class TibberWeightedConsensusSensor(CoordinatorEntity[TibberDataUpdateCoordinato
         if not self.coordinator.last_update_success or self.coordinator.data is None:
             return False
 
-        current = self.coordinator.data.get("current", {})
-        if current.get("total") is None or current.get("level") is None:
-            return False
-
-        return True
-
-    def _get_48h_prices(self) -> list[float]:
-        """Get 48 hours of price data."""
-        today = self.coordinator.data.get("today", [])
-        tomorrow = self.coordinator.data.get("tomorrow", [])
-        yesterday = self.coordinator.data.get("yesterday", [])
-
-        prices = []
-
-        if tomorrow:
-            for entry in today + tomorrow:
-                if entry.get("total") is not None:
-                    prices.append(entry["total"])
-        elif yesterday:
-            for entry in yesterday + today:
-                if entry.get("total") is not None:
-                    prices.append(entry["total"])
-        else:
-            for entry in today:
-                if entry.get("total") is not None:
-                    prices.append(entry["total"])
-
-        return prices
-
-    def _calculate_pct_vs_average(self, current_price: float, prices: list[float]) -> float:
-        """Calculate percentage difference from average."""
-        if not prices:
-            return 0.0
-
-        avg_price = sum(prices) / len(prices)
-        if avg_price == 0:
-            return 0.0
-
-        pct_diff = ((current_price - avg_price) / avg_price) * 100
-        return pct_diff
-
-    def _get_30d_percentage(self) -> float | None:
-        """Get 30d baseline percentage if available."""
-        # Try to get from 30d baseline sensor if it exists
-        baseline_entity = f"sensor.tibber_30d_baseline_comparison"
-        state = self._hass.states.get(baseline_entity)
-
-        if not state or state.state in ("unavailable", "unknown", None):
-            return None
-
-        # Get difference_percent attribute
-        diff_percent = state.attributes.get(ATTR_DIFFERENCE_PERCENT)
-        if diff_percent is None:
-            return None
-
-        try:
-            return float(diff_percent)
-        except (ValueError, TypeError):
-            return None
+        data = self.coordinator.data
+        return data["has_current_price"] and data["has_level"]
 
     def _get_score_description(self, score: float) -> str:
         """Convert score to human-readable description.
@@ -1,18 +1,77 @@
 """Tibber API client for GraphQL queries."""
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import time
 from typing import Any
 
 import aiohttp
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util.json import json_loads
 
 from .const import TIBBER_API_URL, TIBBER_USER_AGENT
 
 _LOGGER = logging.getLogger(__name__)
 
+_REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# Queries are constant documents; per-call values go in GraphQL variables
+_PRICE_QUERY = """
+{
+    viewer {
+        homes {
+            currentSubscription {
+                priceInfo {
+                    current {
+                        total
+                        currency
+                        level
+                        startsAt
+                    }
+                    today {
+                        total
+                        currency
+                        level
+                        startsAt
+                    }
+                    tomorrow {
+                        total
+                        currency
+                        level
+                        startsAt
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+_HISTORY_QUERY = """
+query($resolution: EnergyResolution!, $last: Int!) {
+    viewer {
+        homes {
+            consumption(resolution: $resolution, last: $last) {
+                nodes {
+                    from
+                    unitPrice
+                    unitPriceVAT
+                }
+            }
+        }
+    }
+}
+"""
+
+
+def token_unique_id(api_token: str) -> str:
+    """Return a stable, non-reversible config entry unique ID for an API token."""
+    return hashlib.sha256(api_token.encode()).hexdigest()[:16]
+
 
 class TibberApiClient:
     """Client for interacting with Tibber GraphQL API."""
@@ -21,26 +80,33 @@ class TibberApiClient:
         """Initialize the Tibber API client."""
         self._api_token = api_token
         self._session = async_get_clientsession(hass)
-
-    async def _query(self, query: str) -> dict[str, Any]:
-        """Execute a GraphQL query against the Tibber API."""
-        headers = {
-            "Authorization": f"Bearer {self._api_token}",
+        self._headers = {
+            "Authorization": f"Bearer {api_token}",
             "Content-Type": "application/json",
             "User-Agent": TIBBER_USER_AGENT,
         }
+        # Last price data with the UNIX time it expires (top of the next hour)
+        self._price_cache: tuple[float, dict[str, Any]] | None = None
+        self._price_lock = asyncio.Lock()
 
-        payload = {"query": query}
+    async def _query(
+        self, query: str, variables: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        """Execute a GraphQL query against the Tibber API."""
+        payload: dict[str, Any] = {"query": query}
+        if variables:
+            payload["variables"] = variables
 
         try:
             async with self._session.post(
                 TIBBER_API_URL,
                 json=payload,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=30),
+                headers=self._headers,
+                timeout=_REQUEST_TIMEOUT,
             ) as response:
                 response.raise_for_status()
-                data = await response.json()
+                # orjson-backed loader shipped with Home Assistant
+                data = await response.json(loads=json_loads)
 
                 if "errors" in data:
                     error_messages = [error.get("message", "") for error in data["errors"]]
@@ -55,6 +121,16 @@ class TibberApiClient:
             _LOGGER.error("Unexpected error communicating with Tibber API: %s", err)
             raise TibberApiError(f"Unexpected error: {err}") from err
 
+    async def validate_token(self) -> None:
+        """Validate the API token with the smallest authenticated query.
+
+        Raises:
+            TibberApiError: If the token is rejected or the response is invalid
+        """
+        data = await self._query("{ viewer { name } }")
+        if not data.get("viewer"):
+            raise TibberApiError("No viewer returned for API token")
+
     async def get_current_price(self) -> dict[str, Any]:
         """Get the current electricity price.
 
@@ -70,44 +146,28 @@ class TibberApiClient:
     async def get_price_data(self) -> dict[str, Any]:
         """Get complete price data including current, today, and tomorrow.
 
+        Prices only change on the hour, so the response is reused until the
+        top of the next hour. Concurrent callers share a single request.
+
         Returns:
             dict with keys:
                 - current: Current price info {total, currency, level, startsAt}
                 - today: List of hourly prices for today
                 - tomorrow: List of hourly prices for tomorrow (empty before ~13:00)
         """
-        query = """
-        {
-            viewer {
-                homes {
-                    currentSubscription {
-                        priceInfo {
-                            current {
-                                total
-                                currency
-                                level
-                                startsAt
-                            }
-                            today {
-                                total
-                                currency
-                                level
-                                startsAt
-                            }
-                            tomorrow {
-                                total
-                                currency
-                                level
-                                startsAt
-                            }
-                        }
-                    }
-                }
-            }
-        }
-        """
+        async with self._price_lock:
+            now = time.time()
+            if self._price_cache is None or now >= self._price_cache[0]:
+                data = await self._fetch_price_data()
+                self._price_cache = (now - now % 3600 + 3600, data)
+            data = self._price_cache[1]
+
+        # Callers adjust the current price in place, so hand out copies
+        return {**data, "current": dict(data["current"])}
 
-        data = await self._query(query)
+    async def _fetch_price_data(self) -> dict[str, Any]:
+        """Query current, today and tomorrow prices from the Tibber API."""
+        data = await self._query(_PRICE_QUERY)
 
         try:
             homes = data.get("viewer", {}).get("homes", [])
@@ -156,13 +216,11 @@ class TibberApiClient:
             last: Number of records to fetch (e.g., 720 = 30 days of hourly data)
 
         Returns:
-            List of consumption nodes, each containing:
+            List of consumption nodes, each containing only the price fields
+            the history fallback reads:
                 - from: ISO timestamp for period start
-                - to: ISO timestamp for period end
                 - unitPrice: Price per kWh (excluding VAT)
                 - unitPriceVAT: VAT amount per kWh
-                - cost: Total cost for the period
-                - consumption: kWh consumed in the period
 
         Raises:
             TibberApiError: If API request fails or response is invalid
@@ -170,27 +228,10 @@ class TibberApiClient:
         # Cap the request to prevent huge API calls
         last = min(last, 1000)  # Tibber API limit
 
-        query = f"""
-        {{
-            viewer {{
-                homes {{
-                    consumption(resolution: {resolution}, last: {last}) {{
-                        nodes {{
-                            from
-                            to
-                            unitPrice
-                            unitPriceVAT
-                            cost
-                            consumption
-                        }}
-                    }}
-                }}
-            }}
-        }}
-        """
-
         try:
-            data = await self._query(query)
+            data = await self._query(
+                _HISTORY_QUERY, {"resolution": resolution, "last": last}
+            )
 
             homes = data.get("viewer", {}).get("homes", [])
             if not homes:
@@ -6,7 +6,7 @@ from __future__ import annotations
 import argparse
 import asyncio
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Any, Iterable, List
 
 try:
@@ -14,6 +14,11 @@ try:
 except Exception:  # pragma: no cover
     ZoneInfo = None  # type: ignore
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover - orjson is optional
+    from json import loads as json_loads
+
 import aiohttp
 
 TIBBER_API_URL = "https://api.tibber.com/v1-beta/gql"
@@ -67,83 +72,76 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-async def fetch_price_data(session: aiohttp.ClientSession, token: str) -> dict[str, Any]:
-    query = """
-    {
-        viewer {
-            homes {
-                currentSubscription {
-                    priceInfo {
-                        current {
-                            total
-                            currency
-                            level
-                            startsAt
-                        }
-                        today {
-                            total
-                            currency
-                            level
-                            startsAt
-                        }
-                        tomorrow {
-                            total
-                            currency
-                            level
-                            startsAt
-                        }
+_PRICE_INFO_FIELDS = """
+            currentSubscription {
+                priceInfo {
+                    current {
+                        total
+                        currency
+                        level
+                        startsAt
+                    }
+                    today {
+                        total
+                        currency
+                        level
+                        startsAt
+                    }
+                    tomorrow {
+                        total
+                        currency
+                        level
+                        startsAt
                     }
                 }
-            }
-        }
-    }
-    """
-
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-        "User-Agent": "Tibber-Hourly-Insights/standalone",
-    }
-
-    async with session.post(
-        TIBBER_API_URL,
-        json={"query": query},
-        headers=headers,
-        timeout=aiohttp.ClientTimeout(total=30),
-    ) as resp:
-        resp.raise_for_status()
-        payload = await resp.json()
-
-    if "errors" in payload:
-        messages = ", ".join(err.get("message", "") for err in payload["errors"])
-        raise RuntimeError(f"Tibber API error: {messages}")
-
-    return payload.get("data", {})
-
-
-async def fetch_hourly_consumption(
+            }"""
+
+_CONSUMPTION_FIELDS = """
+            consumption(resolution: HOURLY, last: $hours) {
+                nodes {
+                    from
+                    to
+                    unitPrice
+                    unitPriceVAT
+                    currency
+                }
+            }"""
+
+PRICE_QUERY = f"""
+{{
+    viewer {{
+        homes {{{_PRICE_INFO_FIELDS}
+        }}
+    }}
+}}
+"""
+
+# Prices and hourly history in one document, saving a round trip
+PRICE_AND_HISTORY_QUERY = f"""
+query($hours: Int!) {{
+    viewer {{
+        homes {{{_PRICE_INFO_FIELDS}{_CONSUMPTION_FIELDS}
+        }}
+    }}
+}}
+"""
+
+
+async def fetch_price_data(
     session: aiohttp.ClientSession,
     token: str,
-    hours: int,
+    history_hours: int | None = None,
 ) -> dict[str, Any]:
-    """Fetch hourly consumption nodes (includes unit prices) for a given hour span."""
-    query = """
-    query($hours: Int!) {
-        viewer {
-            homes {
-                consumption(resolution: HOURLY, last: $hours) {
-                    nodes {
-                        from
-                        to
-                        unitPrice
-                        unitPriceVAT
-                        currency
-                    }
-                }
-            }
-        }
-    }
+    """Fetch current/today/tomorrow prices, plus hourly history if requested.
+
+    With history_hours, the consumption nodes (including unit prices) for
+    that many hours are requested in the same GraphQL document, so the
+    response can be passed to both parse_prices and parse_consumption.
     """
+    if history_hours:
+        body = {"query": PRICE_AND_HISTORY_QUERY, "variables": {"hours": history_hours}}
+    else:
+        body = {"query": PRICE_QUERY}
 
     headers = {
         "Authorization": f"Bearer {token}",
@@ -153,12 +151,12 @@ async def fetch_hourly_consumption(
 
     async with session.post(
         TIBBER_API_URL,
-        json={"query": query, "variables": {"hours": hours}},
+        json=body,
         headers=headers,
         timeout=aiohttp.ClientTimeout(total=30),
     ) as resp:
         resp.raise_for_status()
-        payload = await resp.json()
+        payload = await resp.json(loads=json_loads)
 
     if "errors" in payload:
         messages = ", ".join(err.get("message", "") for err in payload["errors"])
@@ -250,32 +248,54 @@ def parse_consumption(
 
 def filter_same_hour(points: Iterable[ConsumptionPoint], hour: int, tz) -> list[ConsumptionPoint]:
     """Filter consumption points to a specific local hour."""
-    filtered: list[ConsumptionPoint] = []
-    for p in points:
-        local_ts = p.starts_at.astimezone(tz)
-        if local_ts.hour == hour:
-            filtered.append(p)
-    return filtered
+    points = list(points)
+    if not points:
+        return []
+
+    # Sample the UTC offset once per day across the window; --history-days is
+    # unbounded, so the ends alone can match while the middle crosses DST
+    start = min(p.starts_at for p in points)
+    end = max(p.starts_at for p in points)
+    first = start.astimezone(tz).utcoffset()
+    step = timedelta(days=1)
+    ts = start + step
+    single_offset = first is not None and end.astimezone(tz).utcoffset() == first
+    while single_offset and ts < end:
+        single_offset = ts.astimezone(tz).utcoffset() == first
+        ts += step
+    if not single_offset:
+        return [p for p in points if p.starts_at.astimezone(tz).hour == hour]
+
+    # Single offset: local hour straight from the UNIX timestamp
+    offset = int(first.total_seconds())
+    return [
+        p for p in points
+        if (int(p.starts_at.timestamp()) + offset) // 3600 % 24 == hour
+    ]
+
+
+def _format_price_line(p: PricePoint) -> str:
+    ts = datetime.fromisoformat(p.starts_at.replace("Z", "+00:00"))
+    return f"  {ts.isoformat()} -> {p.total:.4f} {p.currency}/kWh ({p.level})"
 
 
 def print_prices(current: PricePoint, today: list[PricePoint], tomorrow: list[PricePoint], show_tomorrow: bool) -> None:
-    print("Current price")
-    print(f"  Total:    {current.total:.4f} {current.currency}/kWh")
-    print(f"  Level:    {current.level}")
-    print(f"  StartsAt: {current.starts_at}")
-    print()
-
-    print("Today")
-    for p in today:
-        ts = datetime.fromisoformat(p.starts_at.replace("Z", "+00:00"))
-        print(f"  {ts.isoformat()} -> {p.total:.4f} {p.currency}/kWh ({p.level})")
+    # Build the whole report and write it in one call instead of line by line
+    lines = [
+        "Current price",
+        f"  Total:    {current.total:.4f} {current.currency}/kWh",
+        f"  Level:    {current.level}",
+        f"  StartsAt: {current.starts_at}",
+        "",
+        "Today",
+    ]
+    lines.extend(_format_price_line(p) for p in today)
 
     if show_tomorrow and tomorrow:
-        print()
-        print("Tomorrow")
-        for p in tomorrow:
-            ts = datetime.fromisoformat(p.starts_at.replace("Z", "+00:00"))
-            print(f"  {ts.isoformat()} -> {p.total:.4f} {p.currency}/kWh ({p.level})")
+        lines.extend(("", "Tomorrow"))
+        lines.extend(_format_price_line(p) for p in tomorrow)
+
+    print("\n".join(lines))
 
 
 def print_history(points: List[ConsumptionPoint], hour: int, tz) -> None:
@@ -287,17 +307,22 @@ def print_history(points: List[ConsumptionPoint], hour: int, tz) -> None:
     prices = [p.unit_price for p in points]
     currency = points[0].currency
 
-    print()
-    print(f"History for hour {hour:02d} (local time)")
-    for p in points:
-        ts = p.starts_at.astimezone(tz)
-        print(f"  {ts.isoformat()} -> {p.unit_price:.4f} {currency}/kWh")
+    lines = ["", f"History for hour {hour:02d} (local time)"]
+    lines.extend(
+        f"  {p.starts_at.astimezone(tz).isoformat()} -> {p.unit_price:.4f} {currency}/kWh"
+        for p in points
+    )
 
     avg = sum(prices) / len(prices)
-    print(f"\nSamples: {len(points)}")
-    print(f"Average: {avg:.4f} {currency}/kWh")
-    print(f"Min:     {min(prices):.4f} {currency}/kWh")
-    print(f"Max:     {max(prices):.4f} {currency}/kWh")
+    lines.extend(
+        (
+            f"\nSamples: {len(points)}",
+            f"Average: {avg:.4f} {currency}/kWh",
+            f"Min:     {min(prices):.4f} {currency}/kWh",
+            f"Max:     {max(prices):.4f} {currency}/kWh",
+        )
+    )
+    print("\n".join(lines))
 
 
 async def main() -> None:
@@ -311,22 +336,29 @@ async def main() -> None:
     if tz is None:
         tz = datetime.now().astimezone().tzinfo or timezone.utc
 
+    history_hours = args.history_days * 24 if args.history_days > 0 else None
+
     async with aiohttp.ClientSession() as session:
-        data = await fetch_price_data(session, args.token)
-        history_data = None
-        if args.history_days > 0:
-            hours = max(1, args.history_days * 24)
-            history_data = await fetch_hourly_consumption(session, args.token, hours)
+        data = await fetch_price_data(session, args.token, history_hours)
 
     current, today, tomorrow = parse_prices(data)
     print_prices(current, today, tomorrow, args.show_tomorrow)
 
-    if history_data:
+    if history_hours:
         target_hour = args.hour if args.hour is not None else datetime.now(tz).hour
-        consumption_points = parse_consumption(history_data, fallback_currency=current.currency)
+        consumption_points = parse_consumption(data, fallback_currency=current.currency)
         filtered = filter_same_hour(consumption_points, target_hour, tz)
         print_history(filtered, target_hour, tz)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop  # optional, faster event loop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        if hasattr(uvloop, "run"):  # uvloop >= 0.18
+            uvloop.run(main())
+        else:
+            uvloop.install()
+            asyncio.run(main())
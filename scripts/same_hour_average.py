@@ -5,20 +5,22 @@ This mirrors the logic in TibberHistoryHelper.get_same_hour_average():
 - pulls states for a single entity from the Home Assistant recorder DB
 - keeps samples where the timestamp hour matches the current hour
 - ignores unavailable/unknown states
+- keeps the latest sample per local date
 - reports average, min, max, and sample count
 
-By default it uses the system local timezone for the “current hour” and
-compares that to timestamps converted from UTC (how HA stores them). Use
---timezone to override.
+By default it uses the system's IANA timezone (from $TZ or /etc/localtime)
+for the “current hour” and turns it into one UTC window per day, matched
+against the recorder's last_updated_ts column in SQL. Use --timezone to
+override.
 """
 
 from __future__ import annotations
 
 import argparse
+import os
 import sqlite3
-from datetime import datetime, timedelta, timezone, tzinfo
+from datetime import date, datetime, timedelta, timezone, tzinfo
 from pathlib import Path
-from typing import Iterable, Tuple
 
 try:
     from zoneinfo import ZoneInfo
@@ -26,7 +28,13 @@ except Exception:  # pragma: no cover
     ZoneInfo = None  # type: ignore
 
 
-Row = Tuple[float, datetime]
+# Read tuning for large recorder databases: 256 MiB mmap, 64 MiB page cache
+_READ_PRAGMAS = (
+    "PRAGMA query_only = 1",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -65536",
+    "PRAGMA temp_store = MEMORY",
+)
 
 
 def parse_args() -> argparse.Namespace:
@@ -53,77 +61,120 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument(
         "--timezone",
         default=None,
-        help="Timezone name (e.g., Europe/Oslo). Defaults to system local.",
+        help="Timezone name (e.g., Europe/Oslo). Defaults to the system timezone.",
     )
     return parser.parse_args()
 
 
+def system_timezone() -> tzinfo:
+    """Return the system's IANA timezone, or its current fixed offset.
+
+    Only a named zone knows about DST changes, so it is looked up from $TZ
+    or the /etc/localtime symlink before falling back to the offset.
+    """
+    if ZoneInfo is not None:
+        names = []
+        if tz_env := os.environ.get("TZ"):
+            names.append(tz_env.lstrip(":"))
+        localtime = Path("/etc/localtime")
+        if localtime.is_symlink():
+            target = str(localtime.resolve())
+            if "zoneinfo/" in target:
+                names.append(target.split("zoneinfo/", 1)[1])
+        for name in names:
+            try:
+                return ZoneInfo(name)
+            except Exception:
+                continue
+
+    return datetime.now().astimezone().tzinfo or timezone.utc
+
+
+def same_hour_windows(now: datetime, days: int) -> list[tuple[float, float]]:
+    """Return one (start, end) UNIX window per day covering the current local hour.
+
+    Mirrors _same_hour_windows() in the integration's history module. Day
+    arithmetic happens on the local wall clock, so windows stay on the same
+    local hour across DST changes when now carries an IANA zone; with a
+    fixed-offset zone they drift by an hour on the other side of a change.
+    """
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    windows = []
+    for day in range(days):
+        window_start = (hour_start - timedelta(days=day)).timestamp()
+        windows.append((window_start, window_start + 3600))
+    return windows
+
+
 def load_rows(
     db_path: Path,
     entity_id: str,
-    start: datetime,
-    end: datetime,
-) -> list[Row]:
-    """Load numeric states and timestamps for an entity within a time range."""
-    query = """
-        SELECT s.state, s.last_updated
+    windows: list[tuple[float, float]],
+    tz: tzinfo,
+) -> list[float]:
+    """Load the latest numeric state per local date within the given windows.
+
+    The hour filter runs in SQLite against last_updated_ts, so only
+    same-hour rows reach Python. Like _prices_by_date() in the integration's
+    history module, later samples on the same local date replace earlier ones.
+    """
+    if not windows:
+        return []
+
+    window_sql = " OR ".join(
+        "(s.last_updated_ts >= ? AND s.last_updated_ts < ?)" for _ in windows
+    )
+    # A bound metadata_id lets SQLite seek HA's (metadata_id, last_updated_ts)
+    # index once per window instead of joining states_meta
+    query = f"""
+        SELECT s.state, s.last_updated_ts
         FROM states s
-        JOIN states_meta m ON s.metadata_id = m.metadata_id
-        WHERE m.entity_id = ?
-          AND s.last_updated >= ?
-          AND s.last_updated <= ?
+        WHERE s.metadata_id = ?
+          AND ({window_sql})
           AND s.state NOT IN ('unknown', 'unavailable', 'None')
+        ORDER BY s.last_updated_ts
     """
 
-    rows: list[Row] = []
-    with sqlite3.connect(db_path) as conn:
-        conn.row_factory = sqlite3.Row
-        for row in conn.execute(query, (entity_id, start.isoformat(), end.isoformat())):
-            raw_ts = row["last_updated"]
-            try:
-                ts = datetime.fromisoformat(raw_ts)
-            except ValueError:
-                # HA sometimes stores with space separator; try a fallback
-                try:
-                    ts = datetime.fromisoformat(raw_ts.replace(" ", "T"))
-                except Exception:
-                    continue
+    prices: dict[date, float] = {}
+    # Read-only, so the script is safe to run against a live recorder DB
+    conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        for pragma in _READ_PRAGMAS:
+            conn.execute(pragma)
 
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=timezone.utc)
+        meta = conn.execute(
+            "SELECT metadata_id FROM states_meta WHERE entity_id = ?", (entity_id,)
+        ).fetchone()
+        if meta is None:
+            return []
 
+        params = [meta[0]]
+        for start, end in windows:
+            params.extend((start, end))
+
+        for state, timestamp in conn.execute(query, params):
             try:
-                price = float(row["state"])
+                price = float(state)
             except (ValueError, TypeError):
                 continue
+            prices[datetime.fromtimestamp(timestamp, tz).date()] = price
+    finally:
+        conn.close()
 
-            rows.append((price, ts))
-
-    return rows
-
-
-def same_hour_stats(
-    rows: Iterable[Row],
-    current_hour: int,
-    tzinfo: tzinfo,
-) -> dict[str, float | int] | None:
-    """Compute statistics for samples matching the current hour."""
-    same_hour_prices = []
+    return list(prices.values())
 
-    for price, ts in rows:
-        ts_local = ts.astimezone(tzinfo)
-        if ts_local.hour == current_hour:
-            same_hour_prices.append(price)
 
-    if not same_hour_prices:
+def same_hour_stats(prices: list[float]) -> dict[str, float | int] | None:
+    """Compute statistics for samples already filtered to the current hour."""
+    if not prices:
         return None
 
-    average = sum(same_hour_prices) / len(same_hour_prices)
+    average = sum(prices) / len(prices)
     return {
         "average": average,
-        "sample_count": len(same_hour_prices),
-        "min": min(same_hour_prices),
-        "max": max(same_hour_prices),
+        "sample_count": len(prices),
+        "min": min(prices),
+        "max": max(prices),
     }
 
 
@@ -139,17 +190,18 @@ def main() -> None:
             raise SystemExit(f"Invalid timezone '{args.timezone}': {err}")
 
     if tz is None:
-        tz = datetime.now().astimezone().tzinfo or timezone.utc
+        tz = system_timezone()
 
-    end = datetime.now(tz=timezone.utc)
+    now = datetime.now(tz)
+    end = now.astimezone(timezone.utc)
     start = end - timedelta(days=args.days)
 
     db_path = Path(args.db).expanduser()
     if not db_path.exists():
         raise SystemExit(f"DB file not found: {db_path}")
 
-    rows = load_rows(db_path, args.entity, start, end)
-    stats = same_hour_stats(rows, current_hour=datetime.now(tz).hour, tzinfo=tz)
+    prices = load_rows(db_path, args.entity, same_hour_windows(now, args.days), tz)
+    stats = same_hour_stats(prices)
 
     if not stats:
         print("No valid samples found for the current hour in the given window.")
@@ -157,7 +209,7 @@ def main() -> None:
 
     print(f"Entity: {args.entity}")
     print(f"Window: {start.isoformat()} to {end.isoformat()}")
-    print(f"Hour matched (local): {datetime.now(tz).hour:02d}")
+    print(f"Hour matched (local): {now.hour:02d}")
     print(f"Samples: {stats['sample_count']}")
     print(f"Average: {stats['average']:.4f}")
     print(f"Min: {stats['min']:.4f}")